@@ -1,11 +1,19 @@
 import os
-from flask import Flask, jsonify
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import Flask, Request, current_app, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from sqlalchemy import inspect
 
 from config import Config
+from commands import register_commands
 from extensions import db, migrate, mail
+from services.audit_service import AuditService
 from services.blockchain_service import BlockchainService
+from services.email_service import EmailWorker
+from services.block_cache import block_cache
+from services.stats_cache import stats_cache
 
 # Import blueprints
 from routes.auth_routes import auth_bp
@@ -15,12 +23,35 @@ from routes.sharing_routes import share_bp
 from routes.blockchain_routes import blockchain_bp
 from routes.dashboard_routes import dashboard_bp
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+class AppRequest(Request):
+    """
+    Bulk uploads get their own body size and multipart part limits. Read by
+    Werkzeug when the body is parsed, after URL matching has set the
+    endpoint; works the same on Flask 2.3 and 3.x.
+    """
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == "files_bp.bulk_upload":
+            return current_app.config["BULK_UPLOAD_MAX_CONTENT_LENGTH"]
+        return super().max_content_length
+
+    @property
+    def max_form_parts(self):
+        if self.endpoint == "files_bp.bulk_upload":
+            return current_app.config["BULK_UPLOAD_MAX_FILES"] + 100
+        return super().max_form_parts
+
 
 def create_app(config_class=Config):
     """
     Factory to create Flask app with all configurations
     """
     app = Flask(__name__)
+    app.request_class = AppRequest
     app.config.from_object(config_class)
 
     # -------------------------------
@@ -34,7 +65,7 @@ def create_app(config_class=Config):
     resources={r"/*": {"origins": "*"}},
     # Add 'ngrok-skip-browser-warning' to allow_headers
     allow_headers=["Content-Type", "Authorization", "ngrok-skip-browser-warning"],
-    expose_headers=["Authorization"]
+    expose_headers=["Authorization", "X-Next-Cursor", "X-Total-Count"]
 )
 
     # -------------------------------
@@ -48,6 +79,9 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    stats_cache.init_app(app)
+    block_cache.init_app(app)
+    AuditService.init_app(app)
     JWTManager(app)
 
     # -------------------------------
@@ -60,6 +94,11 @@ def create_app(config_class=Config):
     app.register_blueprint(blockchain_bp)
     app.register_blueprint(dashboard_bp)
 
+    # -------------------------------
+    # CLI maintenance commands
+    # -------------------------------
+    register_commands(app)
+
     # -------------------------------
     # Health check endpoint
     # -------------------------------
@@ -71,13 +110,55 @@ def create_app(config_class=Config):
     # Initialize DB & Blockchain
     # -------------------------------
     with app.app_context():
-        db.create_all()
-        BlockchainService.create_genesis_block()
+        init_schema()
+        # Models query columns added by later migrations: on an older schema
+        # only `flask db stamp` / `flask db upgrade` may run
+        if schema_is_current():
+            BlockchainService.create_genesis_block()
+        else:
+            app.logger.warning("Database schema is not at the migration head; run `flask db upgrade`")
 
     return app
 
 
+def init_schema():
+    """
+    Create the tables of a database Alembic does not manage yet, stamping a
+    brand-new one at the migration head. A managed database (one with an
+    alembic_version table) only changes through `flask db upgrade`:
+    create_all would add tables that pending migrations then fail to create.
+    """
+    tables = inspect(db.engine).get_table_names()
+    if "alembic_version" in tables:
+        return
+
+    db.create_all()
+    if not tables:
+        with db.engine.begin() as connection:
+            MigrationContext.configure(connection).stamp(ScriptDirectory(MIGRATIONS_DIR), "head")
+
+
+def schema_is_current():
+    """True if the database is stamped at the Alembic head revision."""
+    with db.engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return current == set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+
+
+def start_background_workers(app):
+    """
+    Start the in-process outbox worker. Only the serving entrypoints call
+    this, so CLI commands (including `flask email-worker`), tests and
+    benchmarks never run a second consumer.
+    """
+    if app.config["EMAIL_WORKER_ENABLED"] and "email_worker" not in app.extensions:
+        app.extensions["email_worker"] = EmailWorker(app).start()
+
+
 if __name__ == "__main__":
     # Run on 0.0.0.0 for ngrok tunneling
     app = create_app()
+    # With the debug reloader only the child process serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_workers(app)
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,84 @@
+"""
+Block append throughput under concurrent writers.
+
+Each uploader is a separate process (like a gunicorn worker) appending
+blocks to a shared SQLite database through BlockchainService.add_block.
+
+    python benchmarks/append_throughput.py [--blocks 50] [--writers 1 8 32]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from services.blockchain_service import BlockchainService  # noqa: E402
+
+
+def make_app(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 60}}
+
+    return create_app(BenchConfig)
+
+
+def writer(db_path, blocks, start, results):
+    app = make_app(db_path)
+    ok = failed = 0
+    with app.app_context():
+        start.wait()
+        for i in range(blocks):
+            try:
+                BlockchainService.add_block({"type": "bench", "pid": os.getpid(), "n": i})
+                ok += 1
+            except Exception:
+                db.session.rollback()
+                failed += 1
+    results.put((ok, failed))
+
+
+def run(writers, blocks):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    make_app(db_path)  # create schema + genesis once
+
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=writer, args=(db_path, blocks, start, results)) for _ in range(writers)]
+    for p in procs:
+        p.start()
+
+    time.sleep(2)  # let every worker finish importing and connecting
+    t0 = time.perf_counter()
+    start.set()
+    totals = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+
+    ok = sum(t[0] for t in totals)
+    failed = sum(t[1] for t in totals)
+
+    app = make_app(db_path)
+    with app.app_context():
+        valid = BlockchainService.validate_chain(full=True)["valid"]
+
+    print(f"writers={writers:>3}  appended={ok:>5}  failed={failed:>5}  "
+          f"elapsed={elapsed:6.2f}s  throughput={ok / elapsed:8.1f} blocks/s  chain_valid={valid}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=50, help="blocks appended per writer")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    for n in args.writers:
+        run(n, args.blocks)
@@ -3,6 +3,7 @@ import json
 from datetime import datetime
 from extensions import db
 from models import Block
+from services.blockchain_service import BlockchainService
 
 
 def compute_block_hash(index: int, previous_hash: str, timestamp: str, data: str) -> str:
@@ -37,7 +38,8 @@ def create_genesis_block():
         previous_hash="0",
         block_hash=genesis_hash,
         data=genesis_data,
-        timestamp=dt
+        timestamp=dt,
+        block_type="genesis"
     )
 
     db.session.add(genesis)
@@ -69,32 +71,19 @@ def add_block(data_payload) -> Block:
         previous_hash=last.block_hash,
         block_hash=new_hash,
         data=data_json,
-        timestamp=dt
+        timestamp=dt,
+        **Block.payload_columns(data_payload)
     )
 
     db.session.add(block)
+    BlockchainService.index_filehashes(index, data_payload)
     db.session.commit()
     return block
 
 
 def find_block_by_filehash(filehash: str):
     """
-    Search blocks for a filehash inside their data JSON.
-    Returns a list of matching Block objects.
+    Look up blocks referencing a filehash via the block_filehashes index.
+    Returns a list of matching Block objects, newest first.
     """
-    blocks = Block.query.order_by(Block.index.desc()).all()
-    matches = []
-
-    for b in blocks:
-        try:
-            data = json.loads(b.data)
-            if isinstance(data, dict):
-                fh_list = data.get("filehashes") or []
-                if filehash in fh_list:
-                    matches.append(b)
-            elif isinstance(data, list) and filehash in data:
-                matches.append(b)
-        except Exception:
-            continue
-
-    return matches
+    return BlockchainService.find_blocks_by_filehash(filehash)
@@ -0,0 +1,65 @@
+import os
+import click
+from extensions import db
+from models import FileRecord
+from services.blockchain_service import BlockchainService
+from services.batch_service import BatchService
+from services.chain_audit import ChainAuditService
+from services.email_service import EmailWorker
+from services.storage_service import StorageService
+
+
+def register_commands(app):
+    """
+    Register maintenance commands on the Flask CLI (`flask <command>`).
+    """
+
+    @app.cli.command("backfill-filehash-index")
+    def backfill_filehash_index():
+        """Index file hashes of blocks created before the index existed."""
+        count = BlockchainService.backfill_filehash_index()
+        click.echo(f"Indexed {count} block(s)")
+
+    @app.cli.command("seal-pending-blocks")
+    def seal_pending_blocks():
+        """Seal queued file registrations into blocks (for cron/timers)."""
+        sealed = 0
+        while BatchService.seal() is not None:
+            sealed += 1
+        click.echo(f"Sealed {sealed} block(s)")
+
+    @app.cli.command("backfill-file-sizes")
+    def backfill_file_sizes():
+        """Record on-disk sizes for files uploaded before sizes were stored."""
+        count = 0
+        for record in FileRecord.query.filter(FileRecord.size == 0).yield_per(500):
+            path = StorageService.record_path(record)
+            if os.path.exists(path):
+                record.size = os.path.getsize(path)
+                count += 1
+        db.session.commit()
+        click.echo(f"Updated {count} file(s)")
+
+    @app.cli.command("sweep-blobs")
+    @click.option("--grace", type=int, default=None, help="Minimum idle age in seconds (default: STORAGE_SWEEP_GRACE).")
+    def sweep_blobs(grace):
+        """Delete stored files no record references any more (for cron/timers)."""
+        grace = app.config["STORAGE_SWEEP_GRACE"] if grace is None else grace
+        click.echo(f"Removed {StorageService.sweep(grace)} file(s)")
+
+    @app.cli.command("email-worker")
+    def email_worker():
+        """Deliver queued emails in a dedicated process until interrupted."""
+        click.echo("Draining the email outbox (Ctrl+C to stop)")
+        EmailWorker(app).run()
+
+    @app.cli.command("audit-chain")
+    @click.option("--workers", type=int, default=None, help="Worker processes (default: CHAIN_AUDIT_WORKERS or one per CPU).")
+    @click.option("--segment-size", type=int, default=None, help="Blocks per work unit.")
+    def audit_chain(workers, segment_size):
+        """Re-verify every block on a process pool (for the nightly integrity job)."""
+        report = ChainAuditService.audit(workers=workers, segment_size=segment_size)
+        for key, value in report.items():
+            click.echo(f"{key}: {value}")
+        if not report["valid"]:
+            raise SystemExit(1)
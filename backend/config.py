@@ -21,6 +21,41 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+    # `flask sweep-blobs` only removes unreferenced files untouched for this long
+    STORAGE_SWEEP_GRACE = int(os.getenv("STORAGE_SWEEP_GRACE", 3600))  # seconds
+
+    # Let the reverse proxy send download bytes: "" | x-sendfile | x-accel-redirect.
+    # For x-accel-redirect, DOWNLOAD_ACCEL_PREFIX is an nginx `internal` location
+    # aliased to the instance uploads folder.
+    DOWNLOAD_OFFLOAD = os.getenv("DOWNLOAD_OFFLOAD", "")
+    DOWNLOAD_ACCEL_PREFIX = os.getenv("DOWNLOAD_ACCEL_PREFIX", "/protected-uploads/")
+    USE_X_SENDFILE = DOWNLOAD_OFFLOAD == "x-sendfile"
+
+    # Full chain audit (flask audit-chain); 0 workers means one per CPU
+    CHAIN_AUDIT_WORKERS = int(os.getenv("CHAIN_AUDIT_WORKERS", 0))
+    CHAIN_AUDIT_SEGMENT_SIZE = int(os.getenv("CHAIN_AUDIT_SEGMENT_SIZE", 10000))
+
+    # Bulk upload: one request, one block, one transaction
+    BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", 10000))
+    BULK_UPLOAD_MAX_CONTENT_LENGTH = int(os.getenv("BULK_UPLOAD_MAX_CONTENT_LENGTH", 2 * 1024 ** 3))
+    BULK_UPLOAD_WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", 4))
+    # Largest single file (part or archive member) and total unpacked archive size
+    BULK_UPLOAD_MAX_FILE_SIZE = int(os.getenv("BULK_UPLOAD_MAX_FILE_SIZE", MAX_CONTENT_LENGTH))
+    BULK_UPLOAD_MAX_UNPACKED_SIZE = int(os.getenv("BULK_UPLOAD_MAX_UNPACKED_SIZE", 4 * 1024 ** 3))
+
+    # Bulk share: files x receivers per request
+    BULK_SHARE_MAX_PAIRS = int(os.getenv("BULK_SHARE_MAX_PAIRS", 10000))
+
+    # Seal uploads into shared blocks instead of one block per file
+    BLOCK_BATCH_ENABLED = os.getenv("BLOCK_BATCH_ENABLED", "False") == "True"
+    BLOCK_BATCH_SIZE = int(os.getenv("BLOCK_BATCH_SIZE", 100))
+    BLOCK_BATCH_MAX_WAIT = int(os.getenv("BLOCK_BATCH_MAX_WAIT", 30))  # seconds
+
+    # Dashboard/admin counters cache; set STATS_CACHE_URL (redis://...) to share it across workers
+    STATS_CACHE_URL = os.getenv("STATS_CACHE_URL")
+    STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 60))
+    STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", 10000))
 
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
@@ -29,6 +64,35 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = MAIL_USERNAME
 
+    # Audit log writes: transaction | buffered | sync (see AuditService)
+    AUDIT_DURABILITY = os.getenv("AUDIT_DURABILITY", "transaction")
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 2.0))
+    AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", 0.5))
+
+    # Explorer caches: serialized blocks (by hash) and rendered /chain pages.
+    # Bounded by entries and bytes; blocks with a larger payload than
+    # BLOCK_CACHE_MAX_ITEM_BYTES are served uncached.
+    BLOCK_CACHE_MAX_ENTRIES = int(os.getenv("BLOCK_CACHE_MAX_ENTRIES", 10000))
+    BLOCK_CACHE_MAX_BYTES = int(os.getenv("BLOCK_CACHE_MAX_BYTES", 256 * 1024 ** 2))
+    BLOCK_CACHE_MAX_ITEM_BYTES = int(os.getenv("BLOCK_CACHE_MAX_ITEM_BYTES", 1024 ** 2))
+    CHAIN_PAGE_CACHE_MAX_ENTRIES = int(os.getenv("CHAIN_PAGE_CACHE_MAX_ENTRIES", 64))
+    CHAIN_PAGE_CACHE_MAX_BYTES = int(os.getenv("CHAIN_PAGE_CACHE_MAX_BYTES", 64 * 1024 ** 2))
+
+    # Outbound email is queued in email_outbox and delivered in the background.
+    # Served apps (wsgi.py) run a delivery thread unless EMAIL_WORKER_ENABLED=False,
+    # which leaves delivery to `flask email-worker`; the CLI never starts one.
+    MAIL_TRANSPORT = os.getenv("MAIL_TRANSPORT", "smtp")  # smtp | stub
+    EMAIL_WORKER_ENABLED = os.getenv("EMAIL_WORKER_ENABLED", "True") == "True"
+    EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 1.0))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BACKOFF = int(os.getenv("EMAIL_RETRY_BACKOFF", 30))  # seconds, doubled per attempt
+    EMAIL_LEASE_SECONDS = int(os.getenv("EMAIL_LEASE_SECONDS", 300))
+    # Sent/failed outbox rows (bodies may hold reset codes) are deleted after this
+    EMAIL_RETENTION_DAYS = int(os.getenv("EMAIL_RETENTION_DAYS", 7))
+
 
     DEBUG = ENV == "development"
     TESTING = ENV == "testing"
@@ -0,0 +1,66 @@
+import hashlib
+
+
+def _hash_pair(left: str, right: str) -> str:
+    # 0x01 prefix separates interior nodes from leaves (second-preimage safety)
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _levels(leaves):
+    """Return every level of the tree, leaves first and the root last."""
+    level = list(leaves)
+    if not level:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+
+def merkle_root(leaves) -> str:
+    """
+    Compute the Merkle root of hex-encoded SHA-256 leaves.
+    An odd node at any level is paired with itself; a single leaf is its own root.
+    """
+    return _levels(leaves)[-1][0]
+
+
+def merkle_proofs(leaves):
+    """
+    Build the inclusion proof of every leaf in one pass over the tree.
+    Each proof is a list of {"hash": sibling, "position": "left"|"right"} steps.
+    """
+    levels = _levels(leaves)
+    proofs = []
+
+    for index in range(len(levels[0])):
+        proof = []
+        position = index
+        for level in levels[:-1]:
+            if position % 2:
+                proof.append({"hash": level[position - 1], "position": "left"})
+            else:
+                sibling = level[position + 1] if position + 1 < len(level) else level[position]
+                proof.append({"hash": sibling, "position": "right"})
+            position //= 2
+        proofs.append(proof)
+
+    return proofs
+
+
+def verify_proof(leaf: str, proof, root: str) -> bool:
+    """Check that `leaf` is included under `root` using an inclusion proof."""
+    node = leaf
+    try:
+        for step in proof:
+            if step["position"] == "left":
+                node = _hash_pair(step["hash"], node)
+            else:
+                node = _hash_pair(node, step["hash"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return node == root
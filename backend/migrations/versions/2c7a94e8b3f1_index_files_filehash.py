@@ -0,0 +1,30 @@
+"""Index files.filehash for content-addressed storage
+
+Revision ID: 2c7a94e8b3f1
+Revises: 9b2e6f1d7c58
+Create Date: 2026-10-18 15:48:11.902635
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7a94e8b3f1'
+down_revision = '9b2e6f1d7c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 8228a4fa8dd9 already creates this index; only databases that lost it
+    # (or predate it) need it here
+    indexes = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('files')}
+    if 'ix_files_filehash' not in indexes:
+        with op.batch_alter_table('files', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_files_filehash'), ['filehash'], unique=False)
+
+
+def downgrade():
+    # The index belongs to 8228a4fa8dd9's schema, so it stays
+    pass
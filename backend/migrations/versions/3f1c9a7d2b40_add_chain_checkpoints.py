@@ -0,0 +1,36 @@
+"""Add chain_checkpoints
+
+Revision ID: 3f1c9a7d2b40
+Revises: 8228a4fa8dd9
+Create Date: 2026-10-18 09:12:41.503318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b40'
+down_revision = '8228a4fa8dd9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases started by an older create_app() may have this table from
+    # db.create_all() already, along with its indexes
+    if 'chain_checkpoints' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'chain_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('block_index', sa.Integer(), nullable=False),
+        sa.Column('block_hash', sa.String(length=128), nullable=False),
+        sa.Column('verified_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('chain_checkpoints')
@@ -0,0 +1,26 @@
+"""Add files.leaf_index for batched blocks
+
+Revision ID: 5d93b7a2e6c8
+Revises: c4b8e0f3a915
+Create Date: 2026-10-18 12:41:52.318004
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d93b7a2e6c8'
+down_revision = 'c4b8e0f3a915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('leaf_index', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.drop_column('leaf_index')
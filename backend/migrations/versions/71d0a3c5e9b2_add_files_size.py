@@ -0,0 +1,39 @@
+"""Add files.size and backfill files.is_verified
+
+Revision ID: 71d0a3c5e9b2
+Revises: 2c7a94e8b3f1
+Create Date: 2026-10-18 16:30:44.045817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71d0a3c5e9b2'
+down_revision = '2c7a94e8b3f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('size', sa.BigInteger(), server_default='0', nullable=False))
+
+    # Listings read is_verified instead of querying certificates per row
+    files = sa.table('files', sa.column('id', sa.Integer), sa.column('is_verified', sa.Boolean))
+    certificates = sa.table('certificates', sa.column('file_id', sa.Integer), sa.column('blockchain_index', sa.Integer))
+    op.execute(
+        files.update()
+        .where(files.c.id.in_(
+            sa.select(certificates.c.file_id).where(certificates.c.blockchain_index.isnot(None))
+        ))
+        .values(is_verified=True)
+    )
+
+    # Sizes of existing files are filled in with `flask backfill-file-sizes`
+
+
+def downgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.drop_column('size')
@@ -0,0 +1,49 @@
+"""Add email_outbox
+
+Revision ID: 8e3b1f7a2d94
+Revises: d5f08b2c4a6e
+Create Date: 2026-10-18 18:45:26.710938
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3b1f7a2d94'
+down_revision = 'd5f08b2c4a6e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases started by an older create_app() may have this table from
+    # db.create_all() already, along with its indexes
+    if 'email_outbox' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('recipients', sa.Text(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_email_outbox_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_email_outbox_next_attempt_at'), ['next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_email_outbox_next_attempt_at'))
+        batch_op.drop_index(batch_op.f('ix_email_outbox_status'))
+
+    op.drop_table('email_outbox')
@@ -0,0 +1,42 @@
+"""Add chain_head append sequencer
+
+Revision ID: 9b2e6f1d7c58
+Revises: e81f4c6a0d27
+Create Date: 2026-10-18 14:52:30.117492
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e6f1d7c58'
+down_revision = 'e81f4c6a0d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases started by an older create_app() may have this table from
+    # db.create_all() already, possibly seeded by create_genesis_block()
+    if 'chain_head' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'chain_head',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('tip_index', sa.Integer(), nullable=False),
+            sa.Column('tip_hash', sa.String(length=128), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # Seed the single sequencer row from the current tip
+    op.execute(
+        "INSERT INTO chain_head (id, tip_index, tip_hash, updated_at) "
+        "SELECT 1, b.\"index\", b.block_hash, CURRENT_TIMESTAMP FROM blocks b "
+        "WHERE b.\"index\" = (SELECT MAX(\"index\") FROM blocks) "
+        "AND NOT EXISTS (SELECT 1 FROM chain_head)"
+    )
+
+
+def downgrade():
+    op.drop_table('chain_head')
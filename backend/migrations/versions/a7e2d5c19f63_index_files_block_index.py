@@ -0,0 +1,26 @@
+"""Index files.block_index
+
+Revision ID: a7e2d5c19f63
+Revises: 3f1c9a7d2b40
+Create Date: 2026-10-18 10:03:17.226841
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e2d5c19f63'
+down_revision = '3f1c9a7d2b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_files_block_index'), ['block_index'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_files_block_index'))
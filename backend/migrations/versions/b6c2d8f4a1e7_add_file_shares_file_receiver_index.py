@@ -0,0 +1,26 @@
+"""Add file_shares (file_id, receiver_id) index
+
+Revision ID: b6c2d8f4a1e7
+Revises: 8e3b1f7a2d94
+Create Date: 2026-10-18 19:04:12.318427
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6c2d8f4a1e7'
+down_revision = '8e3b1f7a2d94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('file_shares', schema=None) as batch_op:
+        batch_op.create_index('ix_file_shares_file_receiver', ['file_id', 'receiver_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('file_shares', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_shares_file_receiver')
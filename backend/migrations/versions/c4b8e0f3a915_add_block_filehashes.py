@@ -0,0 +1,45 @@
+"""Add block_filehashes index table
+
+Revision ID: c4b8e0f3a915
+Revises: a7e2d5c19f63
+Create Date: 2026-10-18 11:20:05.874210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4b8e0f3a915'
+down_revision = 'a7e2d5c19f63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases started by an older create_app() may have this table from
+    # db.create_all() already, along with its indexes
+    if 'block_filehashes' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'block_filehashes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('filehash', sa.String(length=128), nullable=False),
+        sa.Column('block_index', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('filehash', 'block_index', name='uq_filehash_block')
+    )
+    with op.batch_alter_table('block_filehashes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_block_filehashes_filehash'), ['filehash'], unique=False)
+        batch_op.create_index(batch_op.f('ix_block_filehashes_block_index'), ['block_index'], unique=False)
+
+    # Existing chains are indexed with `flask backfill-filehash-index`
+
+
+def downgrade():
+    with op.batch_alter_table('block_filehashes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_block_filehashes_block_index'))
+        batch_op.drop_index(batch_op.f('ix_block_filehashes_filehash'))
+
+    op.drop_table('block_filehashes')
@@ -0,0 +1,44 @@
+"""Add composite indexes for paginated listings
+
+Revision ID: d5f08b2c4a6e
+Revises: 71d0a3c5e9b2
+Create Date: 2026-10-18 17:24:09.387551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f08b2c4a6e'
+down_revision = '71d0a3c5e9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_files_created_at'), ['created_at'], unique=False)
+        batch_op.create_index('ix_files_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_files_user_verified_created', ['user_id', 'is_verified', 'created_at'], unique=False)
+
+    with op.batch_alter_table('file_shares', schema=None) as batch_op:
+        batch_op.create_index('ix_file_shares_receiver_created', ['receiver_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_file_shares_sender_created', ['sender_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('file_shares', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_shares_sender_created')
+        batch_op.drop_index('ix_file_shares_receiver_created')
+
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.drop_index('ix_files_user_verified_created')
+        batch_op.drop_index('ix_files_user_created')
+        batch_op.drop_index(batch_op.f('ix_files_created_at'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_created_at'))
@@ -0,0 +1,32 @@
+"""Add blocks.merkle_root and files.merkle_proof
+
+Revision ID: e81f4c6a0d27
+Revises: 5d93b7a2e6c8
+Create Date: 2026-10-18 13:37:08.661295
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81f4c6a0d27'
+down_revision = '5d93b7a2e6c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('merkle_root', sa.String(length=128), nullable=True))
+
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('merkle_proof', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('files', schema=None) as batch_op:
+        batch_op.drop_column('merkle_proof')
+
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.drop_column('merkle_root')
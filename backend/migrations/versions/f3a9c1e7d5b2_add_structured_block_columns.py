@@ -0,0 +1,98 @@
+"""Add structured block columns
+
+Revision ID: f3a9c1e7d5b2
+Revises: b6c2d8f4a1e7
+Create Date: 2026-10-18 19:21:40.582113
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c1e7d5b2'
+down_revision = 'b6c2d8f4a1e7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+blocks = sa.table(
+    'blocks',
+    sa.column('id', sa.Integer),
+    sa.column('index', sa.Integer),
+    sa.column('data', sa.Text),
+    sa.column('block_type', sa.String),
+    sa.column('file_id', sa.Integer),
+    sa.column('filehash', sa.String),
+    sa.column('owner_id', sa.Integer),
+)
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _columns(index, data):
+    try:
+        payload = json.loads(data)
+    except (TypeError, ValueError):
+        return {'block_type': 'raw', 'file_id': None, 'filehash': None, 'owner_id': None}
+
+    if not isinstance(payload, dict):
+        payload = {}
+    default_type = 'genesis' if index == 0 else 'data'
+    filehash = payload.get('filehash')
+    return {
+        'block_type': payload.get('type') or default_type,
+        'file_id': _int_or_none(payload.get('file_id')),
+        'filehash': filehash if isinstance(filehash, str) else None,
+        'owner_id': _int_or_none(payload.get('owner_id')),
+    }
+
+
+def upgrade():
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('block_type', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('file_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('filehash', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('owner_id', sa.Integer(), nullable=True))
+
+    # Backfill from the stored payloads, a batch of blocks at a time
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(blocks.c.id, blocks.c.index, blocks.c.data)
+            .where(blocks.c.id > last_id)
+            .order_by(blocks.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            connection.execute(
+                blocks.update().where(blocks.c.id == row.id).values(**_columns(row.index, row.data))
+            )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_blocks_block_type'), ['block_type'], unique=False)
+        batch_op.create_index(batch_op.f('ix_blocks_file_id'), ['file_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_blocks_owner_id'), ['owner_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blocks_owner_id'))
+        batch_op.drop_index(batch_op.f('ix_blocks_file_id'))
+        batch_op.drop_index(batch_op.f('ix_blocks_block_type'))
+        batch_op.drop_column('owner_id')
+        batch_op.drop_column('filehash')
+        batch_op.drop_column('file_id')
+        batch_op.drop_column('block_type')
@@ -3,6 +3,17 @@ import json
 from extensions import db
 
 
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str_or_none(value):
+    return value if isinstance(value, str) else None
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -11,7 +22,7 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), nullable=False, default="user")
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
     reset_otp = db.Column(db.String(6), nullable=True)
@@ -35,15 +46,20 @@ class FileRecord(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "name", name="uq_user_filename"),
+        db.Index("ix_files_user_created", "user_id", "created_at"),
+        db.Index("ix_files_user_verified_created", "user_id", "is_verified", "created_at"),
     )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     name = db.Column(db.String(300), nullable=False)
-    filehash = db.Column(db.String(128), nullable=False)
+    filehash = db.Column(db.String(128), nullable=False, index=True)
     storage_uri = db.Column(db.Text, nullable=True)
-    block_index = db.Column(db.Integer, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    size = db.Column(db.BigInteger, default=0, nullable=False)  # bytes, recorded at upload
+    block_index = db.Column(db.Integer, nullable=True, index=True)
+    leaf_index = db.Column(db.Integer, nullable=True)  # position in a batched block
+    merkle_proof = db.Column(db.Text, nullable=True)  # JSON inclusion proof for leaf_index
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     is_verified = db.Column(db.Boolean, default=False, nullable=False)  # new column
 
     owner = db.relationship("User", back_populates="files")
@@ -57,7 +73,9 @@ class FileRecord(db.Model):
             "name": self.name,
             "filehash": self.filehash,
             "storage_uri": self.storage_uri,
+            "size": self.size,
             "block_index": self.block_index,
+            "leaf_index": self.leaf_index,
             "created_at": self.created_at.isoformat()
         }
 class Certificate(db.Model):
@@ -88,9 +106,45 @@ class Block(db.Model):
     index = db.Column(db.Integer, nullable=False, unique=True, index=True)
     previous_hash = db.Column(db.String(128), nullable=False)
     block_hash = db.Column(db.String(128), nullable=False, unique=True)
-    data = db.Column(db.Text, nullable=False)
+    data = db.Column(db.Text, nullable=False)  # canonical JSON payload, as hashed
+    merkle_root = db.Column(db.String(128), nullable=True)  # copy of data["merkle_root"]
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # Copies of common payload fields (see payload_columns), so readers such
+    # as verify_inclusion need not parse `data`. They are outside block_hash;
+    # chain validation and the audit check them against the payload
+    # (expected_columns). block_type "raw" marks a payload that is not valid
+    # JSON. filehash is not indexed: lookups by hash go through
+    # block_filehashes, which also covers batch blocks.
+    COPIED_COLUMNS = ("block_type", "file_id", "filehash", "owner_id", "merkle_root")
+
+    block_type = db.Column(db.String(20), nullable=True, index=True)
+    file_id = db.Column(db.Integer, nullable=True, index=True)
+    filehash = db.Column(db.String(128), nullable=True)
+    owner_id = db.Column(db.Integer, nullable=True, index=True)
+
+    @staticmethod
+    def payload_columns(data, default_type="data"):
+        """Column values derived from a block payload dict, for Block(**...)."""
+        if not isinstance(data, dict):
+            data = {}
+        return {
+            "block_type": data.get("type") or default_type,
+            "file_id": _int_or_none(data.get("file_id")),
+            "filehash": _str_or_none(data.get("filehash")),
+            "owner_id": _int_or_none(data.get("owner_id")),  # payloads may hold the JWT identity string
+            "merkle_root": _str_or_none(data.get("merkle_root")),
+        }
+
+    @staticmethod
+    def expected_columns(index, data_str):
+        """The COPIED_COLUMNS values a stored payload string must have."""
+        try:
+            data = json.loads(data_str)
+        except (TypeError, ValueError):
+            return dict.fromkeys(Block.COPIED_COLUMNS, None) | {"block_type": "raw"}
+        return Block.payload_columns(data, "genesis" if index == 0 else "data")
+
     def data_json(self):
         try:
             return json.loads(self.data)
@@ -106,10 +160,71 @@ class Block(db.Model):
             "timestamp": self.timestamp.isoformat()
         }
 
+    def to_json(self):
+        """
+        to_dict() serialized with sorted keys. The stored payload is already
+        canonical JSON, so it is spliced in rather than parsed and re-dumped.
+        """
+        if self.block_type in (None, "raw"):
+            return json.dumps(self.to_dict(), sort_keys=True)
+        return (
+            f'{{"block_hash": {json.dumps(self.block_hash)}, "data": {self.data}, '
+            f'"index": {self.index}, "previous_hash": {json.dumps(self.previous_hash)}, '
+            f'"timestamp": {json.dumps(self.timestamp.isoformat())}}}'
+        )
+
+
+class BlockFileHash(db.Model):
+    __tablename__ = "block_filehashes"
+
+    __table_args__ = (
+        db.UniqueConstraint("filehash", "block_index", name="uq_filehash_block"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    filehash = db.Column(db.String(128), nullable=False, index=True)
+    block_index = db.Column(db.Integer, nullable=False, index=True)
+
+
+class ChainHead(db.Model):
+    """
+    Single-row sequencer for block appends. Writers update this row first,
+    which takes the database write/row lock and serializes appends across
+    processes until the appending transaction commits.
+    """
+    __tablename__ = "chain_head"
+
+    id = db.Column(db.Integer, primary_key=True)
+    tip_index = db.Column(db.Integer, nullable=False)
+    tip_hash = db.Column(db.String(128), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ChainCheckpoint(db.Model):
+    __tablename__ = "chain_checkpoints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    block_index = db.Column(db.Integer, nullable=False)
+    block_hash = db.Column(db.String(128), nullable=False)
+    verified_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            "block_index": self.block_index,
+            "block_hash": self.block_hash,
+            "verified_at": self.verified_at.isoformat()
+        }
+
 
 class FileShare(db.Model):
     __tablename__ = "file_shares"
 
+    __table_args__ = (
+        db.Index("ix_file_shares_receiver_created", "receiver_id", "created_at"),
+        db.Index("ix_file_shares_sender_created", "sender_id", "created_at"),
+        db.Index("ix_file_shares_file_receiver", "file_id", "receiver_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     file_id = db.Column(db.Integer, db.ForeignKey("files.id"), nullable=False)  # match FileRecord table
     sender_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
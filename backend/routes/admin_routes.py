@@ -1,9 +1,13 @@
-import os
-from flask import Blueprint, current_app, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from extensions import db
 from models import Certificate, Certificate, User, FileRecord, FileShare
 from schemas import UserSchema, FileRecordSchema, FileShareSchema
+from services.block_cache import block_cache
+from services.sharing_service import ShareService
+from services.stats_cache import stats_cache, dashboard_key, ADMIN_STATS_KEY
+from utils import apply_list_filters, keyset_paginate, paginated_response
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
 
@@ -14,6 +18,20 @@ files_schema = FileRecordSchema(many=True)
 share_schema = FileShareSchema()
 shares_schema = FileShareSchema(many=True)
 
+USER_SORT_COLUMNS = {
+    "created_at": User.created_at,
+    "username": User.username,
+    "email": User.email,
+}
+FILE_SORT_COLUMNS = {
+    "created_at": FileRecord.created_at,
+    "name": FileRecord.name,
+    "size": FileRecord.size,
+}
+SHARE_SORT_COLUMNS = {
+    "created_at": FileShare.created_at,
+}
+
 # ---------------------------
 # ADMIN AUTH DECORATOR
 # ---------------------------
@@ -35,8 +53,12 @@ def admin_required(func):
 @jwt_required()
 @admin_required
 def all_users():
-    users = User.query.all()
-    return jsonify(users_schema.dump(users)), 200
+    try:
+        query = apply_list_filters(User.query, [User.username, User.email], User.created_at)
+        users, next_cursor = keyset_paginate(query, USER_SORT_COLUMNS, User.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(users_schema.dump(users), next_cursor)
 
 @admin_bp.route("/users/toggle/<int:user_id>", methods=["POST"])
 @jwt_required()
@@ -47,6 +69,7 @@ def toggle_user(user_id):
         return jsonify({"error": "User not found"}), 404
     user.is_active = not user.is_active
     db.session.commit()
+    stats_cache.invalidate(ADMIN_STATS_KEY)
     return jsonify({"message": f"User {'activated' if user.is_active else 'deactivated'}"}), 200
 
 # ---------------------------
@@ -56,14 +79,23 @@ def toggle_user(user_id):
 @jwt_required()
 @admin_required
 def stats():
-    total_users = User.query.count()
-    active_users = User.query.filter_by(is_active=True).count()
-    total_files = FileRecord.query.count()
-    return jsonify({
-        "total_users": total_users,
-        "active_users": active_users,
-        "total_files": total_files
-    }), 200
+    return jsonify(stats_cache.get_or_compute(ADMIN_STATS_KEY, _compute_admin_stats)), 200
+
+
+@admin_bp.route("/cache-stats", methods=["GET"])
+@jwt_required()
+@admin_required
+def cache_stats():
+    """Hit/miss metrics of this worker's in-process caches."""
+    return jsonify(block_cache.stats()), 200
+
+
+def _compute_admin_stats():
+    return {
+        "total_users": User.query.count(),
+        "active_users": User.query.filter_by(is_active=True).count(),
+        "total_files": FileRecord.query.count()
+    }
 
 # ---------------------------
 # FILES ROUTES
@@ -72,37 +104,30 @@ def stats():
 @jwt_required()
 @admin_required
 def all_files():
-    """Return all files with computed size, owner, uploadedAt, and verified status"""
-    files = FileRecord.query.all()
+    """Return all files with stored size, owner, uploadedAt, and verified status"""
+    query = FileRecord.query.options(joinedload(FileRecord.owner))
+    try:
+        query = apply_list_filters(query, [FileRecord.name], FileRecord.created_at, FileRecord.is_verified)
+        files, next_cursor = keyset_paginate(query, FILE_SORT_COLUMNS, FileRecord.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     result = []
 
     for f in files:
-        # Compute file size if storage_uri exists
-        size = 0
-        if f.storage_uri:
-            file_path = f.storage_uri
-            if not os.path.isabs(file_path):
-                file_path = os.path.join(current_app.instance_path, "uploads", f.name)
-            if os.path.exists(file_path):
-                size = os.path.getsize(file_path)
-
         # Get owner username safely
         owner_name = f.owner.username if f.owner else "Unknown"
 
-        # Check if file has a valid certificate (verified)
-        latest_cert = f.certificates.order_by(Certificate.issued_at.desc()).first()
-        verified = latest_cert is not None and latest_cert.blockchain_index is not None
-
         result.append({
             "id": f.id,
             "name": f.name,
             "owner": owner_name,
-            "size": size,
+            "size": f.size,
             "uploadedAt": f.created_at.isoformat(),
-            "verified": verified
+            "verified": f.is_verified
         })
 
-    return jsonify(result), 200
+    return paginated_response(result, next_cursor)
 
 
 @admin_bp.route("/files/<int:file_id>", methods=["GET"])
@@ -122,9 +147,13 @@ def get_file(file_id):
 @jwt_required()
 @admin_required
 def all_transactions():
-    """Return all file share transactions"""
-    shares = FileShare.query.all()
-    return jsonify(shares_schema.dump(shares)), 200
+    """Return file share transactions, newest first, one page at a time"""
+    try:
+        query = apply_list_filters(ShareService.shares_query(), [FileRecord.name], FileShare.created_at)
+        shares, next_cursor = keyset_paginate(query, SHARE_SORT_COLUMNS, FileShare.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return paginated_response(shares_schema.dump(shares), next_cursor)
 
 @admin_bp.route("/transactions/<int:share_id>", methods=["GET"])
 @jwt_required()
@@ -150,6 +179,7 @@ def deactivate_user(user_id):
         return jsonify({"error": "User not found"}), 404
     user.is_active = False
     db.session.commit()
+    stats_cache.invalidate(ADMIN_STATS_KEY)
     return jsonify({"message": f"User '{user.username}' has been deactivated"}), 200
 
 
@@ -162,12 +192,14 @@ def delete_user(user_id):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    # Optionally delete all files owned by user
+    # Optionally delete all files owned by user; unreferenced blobs are
+    # reclaimed later by `flask sweep-blobs`
     for file in user.files:
         db.session.delete(file)
 
     db.session.delete(user)
     db.session.commit()
+    stats_cache.invalidate(ADMIN_STATS_KEY, dashboard_key(user_id))
     return jsonify({"message": f"User '{user.username}' and all their files have been deleted"}), 200
 
 
@@ -184,6 +216,8 @@ def delete_file(file_id):
     if not file:
         return jsonify({"error": "File not found"}), 404
 
+    owner_id = file.user_id
     db.session.delete(file)
     db.session.commit()
+    stats_cache.invalidate(ADMIN_STATS_KEY, dashboard_key(owner_id))
     return jsonify({"message": f"File '{file.name}' has been deleted"}), 200
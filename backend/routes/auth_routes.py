@@ -3,11 +3,10 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from extensions import db
 from datetime import datetime, timedelta
-from flask_mail import Message
 from models import User
-from extensions import mail
-from flask import current_app
 from schemas import UserSchema, UserRegisterSchema
+from services.email_service import EmailService
+from services.stats_cache import stats_cache
 import random
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
@@ -36,6 +35,7 @@ def register():
     )
     db.session.add(new_user)
     db.session.commit()
+    stats_cache.user_registered()
     return jsonify({"message": "User registered", "user": user_schema.dump(new_user)}), 201
 
 # LOGIN
@@ -78,13 +78,11 @@ def forgot_password():
     user.reset_otp = otp
     user.reset_otp_expiry = datetime.utcnow() + timedelta(minutes=10)
 
-    db.session.commit()
-
-    try:
-        msg = Message(
-            subject="Your Password Reset Code",
-            recipients=[user.email],
-            body=f"""
+    # Queued in the same transaction as the OTP; the outbox worker sends it
+    EmailService.queue_email(
+        subject="Your Password Reset Code",
+        recipients=[user.email],
+        body=f"""
 Hello {user.username},
 
 Your password reset code is:
@@ -94,10 +92,7 @@ Your password reset code is:
 This code expires in 10 minutes.
 If you didn't request this, ignore this email.
 """
-        )
-        mail.send(msg)
-    except Exception as e:
-        current_app.logger.error(f"Mail error: {e}")
+    )
 
     return jsonify({"message": "If email exists, OTP was sent"}), 200
 
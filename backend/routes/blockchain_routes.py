@@ -1,63 +1,217 @@
-from flask import Blueprint, jsonify
+import json
+import time
+from flask import Blueprint, jsonify, Response, stream_with_context, abort
+from services.block_cache import block_cache
 from services.blockchain_service import BlockchainService
-from models import Block, User, FileRecord
+from services.cert_service import CertService
+from models import Block, User, FileRecord, db
 from flask import request
 from sqlalchemy import or_
 
 blockchain_bp = Blueprint("blockchain", __name__, url_prefix="/api/blockchain")
 
+CHAIN_PAGE_SIZE = 100
+CHAIN_MAX_PAGE_SIZE = 1000
+CHAIN_STREAM_BATCH_SIZE = 500
+TX_PAGE_SIZE = 50
+TX_MAX_PAGE_SIZE = 500
+
+
 @blockchain_bp.route("/chain", methods=["GET"])
 def get_chain():
-    blocks = Block.query.order_by(Block.index.asc()).all()
-    return jsonify([b.to_dict() for b in blocks]), 200
+    """
+    Page through the chain by block index: ?after=<index>&limit=<n>.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    ?format=ndjson streams every block after the cursor, one per line.
+    """
+    after = request.args.get("after", type=int)
 
-@blockchain_bp.route("/validate", methods=["GET"])
-def validate_chain():
-    valid = BlockchainService.validate_chain()
-    return jsonify({"valid": valid}), 200
+    if request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        return _stream_chain(after, request.args.get("limit", type=int))
 
-@blockchain_bp.route("/transactions", methods=["GET"])
-def get_transactions():
-    blocks = Block.query.order_by(Block.index.desc()).all()
+    limit = request.args.get("limit", CHAIN_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, CHAIN_MAX_PAGE_SIZE))
 
-    results = []
+    def render():
+        query = Block.query.order_by(Block.index.asc())
+        if after is not None:
+            query = query.filter(Block.index > after)
 
-    for block in blocks:
-        file = FileRecord.query.filter_by(block_index=block.index).first()
-        owner = User.query.get(file.user_id) if file else None
+        # Fetch one extra row to know whether another page exists
+        blocks = query.limit(limit + 1).all()
+        has_more = len(blocks) > limit
+        blocks = blocks[:limit]
+        return {
+            "body": _json_text(block_cache.block_json(b) for b in blocks),
+            "next_cursor": str(blocks[-1].index) if has_more else None,
+            # Blocks follow this page, so it can never change
+            "complete": has_more
+        }
 
-        results.append({
-            "tx_hash": block.block_hash,
-            "block_number": block.index,
-            "timestamp": block.timestamp.isoformat(),
-            "status": "confirmed",
+    return _page_response(block_cache.page(("chain", after, limit), render))
 
-            # SAFE FALLBACKS
-            "file_name": file.name if file else "(No file attached)",
-            "file_hash": file.filehash if file else None,
-            "owner_name": owner.email if owner else None,
-        })
 
-    return jsonify(results), 200
+@blockchain_bp.route("/chain/latest", methods=["GET"])
+def get_latest_blocks():
+    """The newest ?limit=<n> blocks, newest first, re-rendered only when the tip moves."""
+    limit = request.args.get("limit", CHAIN_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, CHAIN_MAX_PAGE_SIZE))
 
+    def render():
+        blocks = Block.query.order_by(Block.index.desc()).limit(limit).all()
+        return {
+            "body": _json_text(block_cache.block_json(b) for b in blocks),
+            "next_cursor": None,
+            "complete": False
+        }
 
+    return _page_response(block_cache.page(("latest", limit), render))
+
+
+def _page_response(page):
+    response = Response(page["body"], mimetype="application/json")
+    if page["next_cursor"] is not None:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return response, 200
+
+
+def _json_text(items):
+    """JSON array text from already-serialized items."""
+    return "[" + ",".join(items) + "]"
+
+
+def _stream_chain(after, limit):
+    query = Block.query.order_by(Block.index.asc())
+    if after is not None:
+        query = query.filter(Block.index > after)
+    if limit:
+        query = query.limit(limit)
+
+    def generate():
+        for block in query.yield_per(CHAIN_STREAM_BATCH_SIZE):
+            yield block.to_json() + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@blockchain_bp.route("/validate", methods=["GET"])
+def validate_chain():
+    """
+    Validation report: ?full=true rescans from genesis, ?all=true lists every
+    failure instead of stopping at the first, and ?format=ndjson streams
+    failures as they are found followed by a summary line.
+    """
+    full = _flag("full")
+    stop_early = not _flag("all")
+
+    if request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        return _stream_validation(full, stop_early)
+
+    report = BlockchainService.validate_chain(full=full, stop_early=stop_early)
+    return jsonify(report), 200
+
+
+def _flag(name):
+    return request.args.get(name, "false").lower() in ("1", "true", "yes")
+
+
+def _stream_validation(full, stop_early):
+    def generate():
+        progress = {}
+        first = None
+        started = time.perf_counter()
+        for failure in BlockchainService.iter_validation(full, stop_early, progress):
+            first = first or failure
+            yield json.dumps(failure) + "\n"
+        yield json.dumps({
+            "valid": first is None,
+            "mode": "full" if full else "incremental",
+            "first_invalid_index": first["index"] if first else None,
+            "failure": first["type"] if first else None,
+            "blocks_checked": progress["checked"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def _transactions_query():
+    # Blocks with their (optional) file and owner in a single round trip
+    return (
+        db.session.query(Block, FileRecord, User)
+        .outerjoin(FileRecord, FileRecord.block_index == Block.index)
+        .outerjoin(User, User.id == FileRecord.user_id)
+    )
 
-@blockchain_bp.route("/transaction/<string:tx_hash>", methods=["GET"])
-def get_transaction(tx_hash):
-    block = Block.query.filter_by(block_hash=tx_hash).first_or_404()
 
-    file = FileRecord.query.filter_by(block_index=block.index).first()
-    owner = User.query.get(file.user_id) if file else None
+def _paginate(query):
+    """
+    Apply ?page=&per_page= to a query.
+    Returns the rows for the page and the total row count.
+    """
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = request.args.get("per_page", TX_PAGE_SIZE, type=int)
+    per_page = max(1, min(per_page, TX_MAX_PAGE_SIZE))
 
-    return jsonify({
+    total = query.order_by(None).count()
+    rows = query.offset((page - 1) * per_page).limit(per_page).all()
+    return rows, total
+
+
+def _transaction_dict(block, file, owner, empty_name=None):
+    return {
         "tx_hash": block.block_hash,
         "block_number": block.index,
         "timestamp": block.timestamp.isoformat(),
         "status": "confirmed",
-        "file_name": file.name if file else None,
+        "file_name": file.name if file else empty_name,
         "file_hash": file.filehash if file else None,
-        "owner_name": owner.email if owner else None
-    })
+        "owner_name": owner.email if owner else None,
+    }
+
+
+def _paginated_response(results, total):
+    response = jsonify(results)
+    response.headers["X-Total-Count"] = str(total)
+    return response, 200
+
+
+@blockchain_bp.route("/transactions", methods=["GET"])
+def get_transactions():
+    query = _transactions_query().order_by(Block.index.desc(), FileRecord.id.asc())
+    rows, total = _paginate(query)
+
+    # SAFE FALLBACKS for blocks without a file (e.g. genesis)
+    results = [
+        _transaction_dict(block, file, owner, empty_name="(No file attached)")
+        for block, file, owner in rows
+    ]
+    return _paginated_response(results, total)
+
+
+@blockchain_bp.route("/transaction/<string:tx_hash>", methods=["GET"])
+def get_transaction(tx_hash):
+    row = _transactions_query().filter(Block.block_hash == tx_hash).first()
+    if row is None:
+        abort(404)
+
+    block, file, owner = row
+    return jsonify(_transaction_dict(block, file, owner))
+
+
+@blockchain_bp.route("/filehash/<string:filehash>", methods=["GET"])
+def find_by_filehash(filehash):
+    """Return every block that registered the given file hash."""
+    blocks = BlockchainService.find_blocks_by_filehash(filehash.lower())
+    return Response(_json_text(block_cache.block_json(b) for b in blocks), mimetype="application/json"), 200
+
+
+@blockchain_bp.route("/certificate/<string:cert_id>", methods=["GET"])
+def verify_certificate(cert_id):
+    """Public certificate check, including the file's Merkle inclusion proof."""
+    result = CertService.verify_certificate(cert_id)
+    if result is None:
+        return jsonify({"error": "Certificate not found"}), 404
+    return jsonify(result), 200
 
 
 @blockchain_bp.route("/search", methods=["GET"])
@@ -67,11 +221,8 @@ def search_blockchain():
     if not q:
         return jsonify([]), 200
 
-    # Join blocks -> files -> users
-    rows = (
-        Block.query
-        .outerjoin(FileRecord, FileRecord.block_index == Block.index)
-        .outerjoin(User, User.id == FileRecord.user_id)
+    query = (
+        _transactions_query()
         .filter(
             or_(
                 Block.block_hash.ilike(f"%{q}%"),
@@ -81,24 +232,9 @@ def search_blockchain():
                 User.username.ilike(f"%{q}%"),
             )
         )
-        .order_by(Block.index.desc())
-        .all()
+        .order_by(Block.index.desc(), FileRecord.id.asc())
     )
+    rows, total = _paginate(query)
 
-    results = []
-
-    for block in rows:
-        file = FileRecord.query.filter_by(block_index=block.index).first()
-        owner = User.query.get(file.user_id) if file else None
-
-        results.append({
-            "tx_hash": block.block_hash,
-            "block_number": block.index,
-            "timestamp": block.timestamp.isoformat(),
-            "status": "confirmed",
-            "file_name": file.name if file else None,
-            "file_hash": file.filehash if file else None,
-            "owner_name": owner.email if owner else None,
-        })
-
-    return jsonify(results), 200
\ No newline at end of file
+    results = [_transaction_dict(block, file, owner) for block, file, owner in rows]
+    return _paginated_response(results, total)
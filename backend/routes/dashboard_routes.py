@@ -1,79 +1,136 @@
-from flask import Blueprint, jsonify
+from datetime import datetime
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, case, func, literal, null, or_, select, union_all
+from extensions import db
 from models import FileRecord, FileShare, Certificate
-from datetime import datetime
-from sqlalchemy import func
+from services.stats_cache import stats_cache, dashboard_key
+from utils import cursor_value, decode_cursor, encode_cursor
 
 
 dashboard_bp = Blueprint("dashboard_bp", __name__, url_prefix="/api/dashboard")
 
+ACTIVITY_PAGE_SIZE = 20
+ACTIVITY_MAX_PAGE_SIZE = 100
+
+
+def _dashboard_stats(user_id):
+    """All dashboard counters in a single aggregate query."""
+    shared_files = (
+        select(func.count(FileShare.id))
+        .where(FileShare.sender_id == user_id)
+        .scalar_subquery()
+    )
+    total_files, verified_files, shared_files = db.session.query(
+        func.count(FileRecord.id),
+        func.coalesce(func.sum(case((FileRecord.is_verified.is_(True), 1), else_=0)), 0),
+        shared_files,
+    ).filter(FileRecord.user_id == user_id).one()
+
+    return {
+        "totalFiles": total_files,
+        "sharedFiles": shared_files,
+        "verifications": verified_files,
+        "pendingVerifications": total_files - verified_files
+    }
+
+
+def _recent_activity(user_id, limit, cursor=None):
+    """
+    Merge uploads, shares and certificates with UNION ALL and let the
+    database sort and limit them. Pages continue after (time, type, id).
+    """
+    uploads = select(
+        FileRecord.id.label("id"),
+        literal("upload").label("type"),
+        FileRecord.name.label("file_name"),
+        null().label("receiver_id"),
+        FileRecord.created_at.label("time"),
+    ).where(FileRecord.user_id == user_id)
+
+    shares = select(
+        FileShare.id,
+        literal("share"),
+        FileRecord.name,
+        FileShare.receiver_id,
+        FileShare.created_at,
+    ).join(FileRecord, FileRecord.id == FileShare.file_id).where(FileShare.sender_id == user_id)
+
+    certs = select(
+        Certificate.id,
+        literal("verify"),
+        FileRecord.name,
+        null(),
+        Certificate.issued_at,
+    ).join(FileRecord, FileRecord.id == Certificate.file_id).where(Certificate.user_id == user_id)
+
+    activity = union_all(uploads, shares, certs).subquery()
+    query = select(activity)
+
+    if cursor:
+        time, kind, last_id = cursor
+        query = query.where(or_(
+            activity.c.time < time,
+            and_(activity.c.time == time, or_(
+                activity.c.type < kind,
+                and_(activity.c.type == kind, activity.c.id < last_id)
+            ))
+        ))
+
+    query = query.order_by(activity.c.time.desc(), activity.c.type.desc(), activity.c.id.desc())
+    rows = db.session.execute(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.time, last.type, last.id])
+
+    descriptions = {
+        "upload": lambda r: f"Uploaded {r.file_name}",
+        "share": lambda r: f"Shared {r.file_name} with user_id {r.receiver_id}",
+        "verify": lambda r: f"Verified {r.file_name} on blockchain",
+    }
+    activity = [
+        {
+            "id": r.id,
+            "type": r.type,
+            "description": descriptions[r.type](r),
+            "time": r.time.isoformat()
+        }
+        for r in rows
+    ]
+    return activity, next_cursor
+
+
 @dashboard_bp.route("", methods=["GET"])
 @jwt_required()
 def get_dashboard():
+    """
+    Dashboard counters plus the newest activity (?limit=, default 20).
+    Older activity is paged with the X-Next-Cursor value as ?cursor=.
+    """
     user_id = get_jwt_identity()
 
-    # Total files uploaded
-    total_files = FileRecord.query.filter_by(user_id=user_id).count()
-
-    # Files shared by this user
-    shared_files = FileShare.query.filter_by(sender_id=user_id).count()
-
-    # Verified files: files with a certificate and blockchain_index
-    verified_files = FileRecord.query.join(Certificate)\
-        .filter(FileRecord.user_id==user_id, Certificate.blockchain_index.isnot(None))\
-        .count()
-
-    # Pending verifications: files without blockchain certificate
-    pending_verifications = FileRecord.query.outerjoin(Certificate)\
-        .filter(FileRecord.user_id==user_id, Certificate.id.is_(None))\
-        .count()
-
-    # Recent activity: upload, share, verify
-    uploads = FileRecord.query.filter_by(user_id=user_id)\
-        .order_by(FileRecord.created_at.desc()).all()
-
-    shares_sent = FileShare.query.filter_by(sender_id=user_id)\
-        .order_by(FileShare.created_at.desc()).all()
-
-    certs = Certificate.query.filter_by(user_id=user_id)\
-        .order_by(Certificate.issued_at.desc()).all()
-
-    # Format activities
-    activity = []
-
-    for f in uploads:
-        activity.append({
-            "id": f.id,
-            "type": "upload",
-            "description": f"Uploaded {f.name}",
-            "time": f.created_at.isoformat()
-        })
-
-    for s in shares_sent:
-        activity.append({
-            "id": s.id,
-            "type": "share",
-            "description": f"Shared {s.file.name} with user_id {s.receiver_id}",
-            "time": s.created_at.isoformat()
-        })
-
-    for c in certs:
-        activity.append({
-            "id": c.id,
-            "type": "verify",
-            "description": f"Verified {c.file.name} on blockchain",
-            "time": c.issued_at.isoformat()
-        })
-
-    # Sort by most recent
-    activity = sorted(activity, key=lambda x: datetime.fromisoformat(x["time"]), reverse=True)
-
-    return jsonify({
-        "stats": {
-            "totalFiles": total_files,
-            "sharedFiles": shared_files,
-            "verifications": verified_files,
-            "pendingVerifications": pending_verifications
-        },
+    limit = request.args.get("limit", ACTIVITY_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, ACTIVITY_MAX_PAGE_SIZE))
+
+    cursor = None
+    if request.args.get("cursor"):
+        try:
+            cursor = decode_cursor(request.args["cursor"])
+            if len(cursor) != 3:
+                raise ValueError("Invalid cursor")
+            cursor = [cursor_value(cursor[0], datetime), cursor_value(cursor[1], str), cursor_value(cursor[2], int)]
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    activity, next_cursor = _recent_activity(user_id, limit, cursor)
+
+    response = jsonify({
+        "stats": stats_cache.get_or_compute(dashboard_key(user_id), lambda: _dashboard_stats(user_id)),
         "recentActivity": activity
-    }), 200
+    })
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
@@ -1,44 +1,54 @@
+import mimetypes
 import os
-import hashlib
+import re
 from flask import Blueprint, request, jsonify, current_app, send_file, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from models import FileRecord, FileShare, db, Certificate
-from services.cert_service import CertService
-from services.audit_service import AuditService
+from models import FileRecord, Certificate, db
+from services.file_service import FileService
+from services.permission_service import PermissionService
+from services.storage_service import StorageService
 from services.blockchain_service import BlockchainService
+from services.batch_service import BatchService
+from utils import hash_file, apply_list_filters, keyset_paginate, paginated_response
 
 files_bp = Blueprint("files_bp", __name__, url_prefix="/api/files")
 
-
-# --------------------- UTILITY ---------------------
-def get_upload_dir():
-    """Return absolute path to uploads folder and create if it doesn't exist."""
-    upload_dir = os.path.join(current_app.instance_path, "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    return upload_dir
+SHA256_HEX = re.compile(r"[0-9a-f]{64}")
+FILE_SORT_COLUMNS = {
+    "created_at": FileRecord.created_at,
+    "name": FileRecord.name,
+    "size": FileRecord.size,
+}
 
 
 # --------------------- LIST FILES ---------------------
 @files_bp.route("", methods=["GET"])
 @jwt_required()
 def list_files():
+    """
+    Keyset-paginated file listing: ?limit=&cursor=&sort=created_at|name|size
+    &order=asc|desc, filtered by ?name=&date_from=&date_to=&verified=.
+    """
     user_id = get_jwt_identity()
-    files = FileRecord.query.filter_by(user_id=user_id).all()
+    query = FileRecord.query.filter_by(user_id=user_id)
+    try:
+        query = apply_list_filters(query, [FileRecord.name], FileRecord.created_at, FileRecord.is_verified)
+        files, next_cursor = keyset_paginate(query, FILE_SORT_COLUMNS, FileRecord.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     result = []
     for f in files:
-        size = os.path.getsize(f.storage_uri) if f.storage_uri and os.path.exists(f.storage_uri) else 0
-        cert = f.certificates.order_by(Certificate.issued_at.desc()).first()
-        verified = cert is not None and cert.blockchain_index is not None
         result.append({
             "id": f.id,
             "name": f.name,
             "filehash": f.filehash,
-            "size": size,
+            "size": f.size,
             "created_at": f.created_at.isoformat(),
-            "verified": verified
+            "verified": f.is_verified
         })
-    return jsonify(result), 200
+    return paginated_response(result, next_cursor)
 
 
 # --------------------- UPLOAD FILE ---------------------
@@ -52,49 +62,13 @@ def upload_file():
         return jsonify({"error": "No file uploaded"}), 400
 
     filename = secure_filename(uploaded_file.filename)
-    existing = FileRecord.query.filter_by(user_id=user_id, name=filename).first()
-    if existing:
-        return jsonify({"error": "File with this name already exists"}), 409
-
-    upload_dir = get_upload_dir()
-    file_path = os.path.join(upload_dir, filename)
-    uploaded_file.save(file_path)
-
-    # Hash file
-    sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    file_hash = sha256.hexdigest()
-
-    # Save DB record
-    record = FileRecord(
-        user_id=user_id,
-        name=filename,
-        filehash=file_hash,
-        storage_uri=file_path
-    )
-    db.session.add(record)
-    db.session.commit()
-
-    # Audit
-    AuditService.log_action(user_id, "UPLOAD", f"File: {filename}")
-
-    # Blockchain
-    block_data = {
-        "type": "file",
-        "file_id": record.id,
-        "filehash": record.filehash,
-        "owner_id": user_id,
-        "filename": record.name,
-        "uploaded_at": record.created_at.isoformat()
-    }
-    block = BlockchainService.add_block(block_data)
-    record.block_index = block.index
-    db.session.commit()
-
-    # Certificate
-    cert = CertService.issue_certificate(user_id, record.id)
+    try:
+        record, cert = FileService.register_upload(user_id, filename, uploaded_file.stream)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    if current_app.config["BLOCK_BATCH_ENABLED"]:
+        return _batched_upload_response(record)
 
     return jsonify({
         "message": "File uploaded successfully",
@@ -102,7 +76,7 @@ def upload_file():
             "id": record.id,
             "name": record.name,
             "filehash": record.filehash,
-            "size": os.path.getsize(record.storage_uri),
+            "size": record.size,
             "created_at": record.created_at.isoformat(),
             "verified": True
         },
@@ -110,42 +84,152 @@ def upload_file():
     }), 201
 
 
+# --------------------- BULK UPLOAD ---------------------
+@files_bp.route("/upload/bulk", methods=["POST"])
+@jwt_required()
+def bulk_upload():
+    """
+    Register many files in one request: multipart parts named "files" and/or
+    zip archives named "archive". All accepted files share one block and one
+    transaction; the response lists a result per file, in request order.
+    Body size and part count limits are raised for this endpoint by AppRequest.
+    """
+    user_id = get_jwt_identity()
+    max_files = current_app.config["BULK_UPLOAD_MAX_FILES"]
+
+    uploads = [
+        (secure_filename(f.filename or ""), lambda f=f: f.stream)
+        for f in request.files.getlist("files")
+    ]
+    try:
+        uploads.extend(FileService.archive_members(a.stream for a in request.files.getlist("archive")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not uploads:
+        return jsonify({"error": "No files uploaded"}), 400
+    if len(uploads) > max_files:
+        return jsonify({"error": f"At most {max_files} files per request"}), 400
+
+    try:
+        results, block = FileService.register_bulk(user_id, uploads)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    registered = sum(1 for r in results if r["status"] == "registered")
+    return jsonify({
+        "message": f"{registered} of {len(results)} files registered",
+        "block_index": block.index if block else None,
+        "registered": registered,
+        "rejected": len(results) - registered,
+        "results": results
+    }), 201 if block else 400
+
+
+def _batched_upload_response(record):
+    """Queue the record for the next batch block; it may be sealed right away."""
+    try:
+        BatchService.maybe_seal()
+    except Exception as e:
+        # The upload is already committed: report it as pending and leave the
+        # records to the next seal (another upload or `flask seal-pending-blocks`)
+        db.session.rollback()
+        current_app.logger.error(f"Could not seal pending uploads: {e}")
+
+    cert = None
+    if record.block_index is not None:
+        cert = record.certificates.order_by(Certificate.issued_at.desc()).first()
+
+    return jsonify({
+        "message": "File uploaded successfully" if cert else "File uploaded, pending block sealing",
+        "file": {
+            "id": record.id,
+            "name": record.name,
+            "filehash": record.filehash,
+            "size": record.size,
+            "created_at": record.created_at.isoformat(),
+            "verified": cert is not None,
+            "block_index": record.block_index,
+            "leaf_index": record.leaf_index
+        },
+        "certificate": cert.to_dict() if cert else None
+    }), 201 if cert else 202
+
+
 # --------------------- DOWNLOAD FILE ---------------------
 @files_bp.route("/download/<int:file_id>", methods=["GET"])
 @jwt_required()
 def download_file(file_id):
     user_id = get_jwt_identity()
-    file = FileRecord.query.get_or_404(file_id)
-
-    # Permission
-    is_owner = file.user_id == user_id
-    is_shared = file.shares.filter_by(receiver_id=user_id).first()
-    if not is_owner and not is_shared:
+    file, access = PermissionService.resolve(user_id, file_id)
+    if file is None:
+        abort(404)
+    if access is None:
         return jsonify({"error": "Access denied"}), 403
 
-    # Use filename in uploads folder if storage_uri is absolute
-    file_path = file.storage_uri
-    if not os.path.isabs(file_path):
-        file_path = os.path.join(get_upload_dir(), file.name)
+    file_path = StorageService.record_path(file)
 
     if not os.path.exists(file_path):
         return jsonify({"error": "File not found on server"}), 404
 
-    return send_file(file_path, as_attachment=True, download_name=file.name)
+    return _send_stored_file(file, file_path)
+
+
+def _send_stored_file(record, file_path):
+    """
+    Send a stored file with a strong ETag (its SHA-256), answering
+    If-None-Match with 304 and Range requests with 206. In x-accel-redirect
+    mode nginx serves the bytes (and ranges); only headers come from here.
+    """
+    upload_dir = StorageService.upload_dir()
+    relative = os.path.relpath(file_path, upload_dir)
+    accel = current_app.config["DOWNLOAD_OFFLOAD"] == "x-accel-redirect"
+
+    if not accel or relative.startswith(os.pardir):
+        return send_file(
+            file_path,
+            as_attachment=True,
+            download_name=record.name,
+            etag=record.filehash,
+            last_modified=record.created_at,
+            conditional=True
+        )
+
+    response = current_app.response_class(mimetype=mimetypes.guess_type(record.name)[0] or "application/octet-stream")
+    response.headers["X-Accel-Redirect"] = current_app.config["DOWNLOAD_ACCEL_PREFIX"].rstrip("/") + "/" + relative.replace(os.sep, "/")
+    response.headers.set("Content-Disposition", "attachment", filename=record.name)
+    response.set_etag(record.filehash)
+    response.last_modified = record.created_at
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 # --------------------- VERIFY FILE ---------------------
 @files_bp.route("/verify", methods=["POST"])
 @jwt_required()
 def verify_file():
+    """
+    Verify a file against its blockchain certificate.
+    Send the file as multipart "file", or JSON {"filename", "filehash"} with
+    the SHA-256 computed client-side to skip the upload entirely.
+    """
     user_id = get_jwt_identity()
-    uploaded_file = request.files.get("file")
-    if not uploaded_file:
-        return jsonify({"error": "Missing file"}), 400
 
-    uploaded_bytes = uploaded_file.read()
-    uploaded_hash = hashlib.sha256(uploaded_bytes).hexdigest()
-    filename = secure_filename(uploaded_file.filename)
+    if request.is_json:
+        data = request.get_json() or {}
+        uploaded_hash = (data.get("filehash") or "").strip().lower()
+        filename = secure_filename(data.get("filename") or "")
+        if not filename or not SHA256_HEX.fullmatch(uploaded_hash):
+            return jsonify({"error": "filename and a SHA-256 filehash are required"}), 400
+    else:
+        uploaded_file = request.files.get("file")
+        if not uploaded_file:
+            return jsonify({"error": "Missing file"}), 400
+
+        # Hash in chunks; werkzeug spools large parts to disk, so the
+        # upload is never held in memory as a whole
+        uploaded_hash = hash_file(uploaded_file.stream, current_app.config["UPLOAD_CHUNK_SIZE"])
+        filename = secure_filename(uploaded_file.filename)
 
     record = FileRecord.query.filter_by(user_id=user_id, name=filename).first()
     if not record:
@@ -155,13 +239,11 @@ def verify_file():
     if not cert or cert.blockchain_index is None:
         return jsonify({"verified": False, "status": "NO_CERTIFICATE", "message": "No blockchain certificate found"}), 400
 
-    block = BlockchainService.get_block_by_index(cert.blockchain_index)
-    if not block:
+    included = BlockchainService.verify_inclusion(record, uploaded_hash, cert.blockchain_index)
+    if included is None:
         return jsonify({"verified": False, "status": "BLOCK_NOT_FOUND", "message": "Blockchain block not found"}), 400
 
-    block_data = BlockchainService.get_block_data(block)
-    original_hash = block_data.get("filehash")
-    if uploaded_hash == original_hash:
+    if included:
         status = "VERIFIED"
         verified = True
     else:
@@ -171,29 +253,44 @@ def verify_file():
     return jsonify({"verified": verified, "status": status, "file": record.to_dict()}), 200
 
 
+# --------------------- INCLUSION PROOF ---------------------
+@files_bp.route("/<int:file_id>/proof", methods=["GET"])
+@jwt_required()
+def get_inclusion_proof(file_id):
+    user_id = get_jwt_identity()
+    record, access = PermissionService.resolve(user_id, file_id)
+    if record is None:
+        abort(404)
+    if access is None:
+        return jsonify({"error": "Access denied"}), 403
+
+    proof = BlockchainService.get_inclusion_proof(record)
+    if proof is None:
+        return jsonify({"error": "File is not on the blockchain yet"}), 404
+    return jsonify(proof), 200
+
+
 # --------------------- GET VERIFIED FILES ---------------------
 @files_bp.route("/verified", methods=["GET"])
 @jwt_required()
 def get_verified_files():
     user_id = get_jwt_identity()
-    files = FileRecord.query.filter_by(user_id=user_id).all()
-    verified_files = []
-
-    for f in files:
-        cert = f.certificates.order_by(Certificate.issued_at.desc()).first()
-        if cert and cert.blockchain_index is not None:
-            verified_files.append(f)
+    query = FileRecord.query.filter_by(user_id=user_id, is_verified=True)
+    try:
+        query = apply_list_filters(query, [FileRecord.name], FileRecord.created_at)
+        verified_files, next_cursor = keyset_paginate(query, FILE_SORT_COLUMNS, FileRecord.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     result = []
     for f in verified_files:
-        size = os.path.getsize(f.storage_uri) if f.storage_uri and os.path.exists(f.storage_uri) else 0
         result.append({
             "id": f.id,
             "name": f.name,
-            "size": size,
+            "size": f.size,
             "uploaded_at": f.created_at.isoformat(),
             "verified": True,
             "owner_id": f.user_id
         })
 
-    return jsonify(result), 200
+    return paginated_response(result, next_cursor)
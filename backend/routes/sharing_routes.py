@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.sharing_service import ShareService
 from schemas import FileShareSchema
+from models import FileRecord, FileShare
+from utils import apply_list_filters, keyset_paginate, paginated_response
 
 share_bp = Blueprint("share", __name__, url_prefix="/api/share")
 share_schema = FileShareSchema()
 shares_schema = FileShareSchema(many=True)
 
+SHARE_SORT_COLUMNS = {
+    "created_at": FileShare.created_at,
+}
+
 @share_bp.route("/share", methods=["POST"])
 @jwt_required()
 def send_share():
@@ -23,16 +29,50 @@ def send_share():
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
+@share_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def send_bulk_share():
+    """Share every file in file_ids with every address in receiver_emails."""
+    sender_id = get_jwt_identity()
+    data = request.get_json() or {}
+    receiver_emails = data.get("receiver_emails")
+    file_ids = data.get("file_ids")
+    if not isinstance(receiver_emails, list) or not isinstance(file_ids, list) or not receiver_emails or not file_ids:
+        return jsonify({"error": "receiver_emails and file_ids lists required"}), 400
+    if not all(isinstance(e, str) and e for e in receiver_emails):
+        return jsonify({"error": "receiver_emails must be non-empty strings"}), 400
+    # bool is an int subclass, but true/false are not file ids
+    if not all(isinstance(f, int) and not isinstance(f, bool) for f in file_ids):
+        return jsonify({"error": "file_ids must be integers"}), 400
+
+    max_pairs = current_app.config["BULK_SHARE_MAX_PAIRS"]
+    if len(receiver_emails) * len(file_ids) > max_pairs:
+        return jsonify({"error": f"At most {max_pairs} file/receiver pairs per request"}), 400
+
+    result = ShareService.share_many(sender_id, receiver_emails, file_ids)
+    # Like bulk upload: 201 if anything was shared, 400 with the same report otherwise
+    return jsonify({"message": f"{result['shared']} share(s) created", **result}), 201 if result["shared"] else 400
+
+def _share_page(query):
+    """Filter (?name=&date_from=&date_to=) and keyset-paginate a share query."""
+    query = apply_list_filters(query, [FileRecord.name], FileShare.created_at)
+    shares, next_cursor = keyset_paginate(query, SHARE_SORT_COLUMNS, FileShare.id)
+    return paginated_response(shares_schema.dump(shares), next_cursor)
+
 @share_bp.route("/shared-with-me", methods=["GET"])
 @jwt_required()
 def received_files():
     user_id = get_jwt_identity()
-    shares = ShareService.get_shared_with_user(user_id)
-    return jsonify(shares_schema.dump(shares)), 200
+    try:
+        return _share_page(ShareService.get_shared_with_user(user_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @share_bp.route("/shared-by-me", methods=["GET"])
 @jwt_required()
 def sent_files():
     user_id = get_jwt_identity()
-    shares = ShareService.get_shared_by_user(user_id)
-    return jsonify(shares_schema.dump(shares)), 200
+    try:
+        return _share_page(ShareService.get_shared_by_user(user_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
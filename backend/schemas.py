@@ -21,7 +21,9 @@ class FileRecordSchema(Schema):
     name = fields.Str(attribute="name")
     filehash = fields.Str()
     storage_uri = fields.Str(allow_none=True)
+    size = fields.Int()
     block_index = fields.Int(allow_none=True)
+    leaf_index = fields.Int(allow_none=True)
     created_at = fields.DateTime()
     owner = fields.Nested(UserSchema, only=("id", "username", "email"), dump_only=True)
 
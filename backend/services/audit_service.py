@@ -1,4 +1,9 @@
+import atexit
+import queue
+import threading
 from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, insert
 from extensions import db
 
 class AuditLog(db.Model):
@@ -20,16 +25,153 @@ class AuditLog(db.Model):
         }
 
 
+class AuditBuffer:
+    """
+    Bounded in-memory queue of audit rows written with bulk inserts by a
+    background thread, every AUDIT_FLUSH_INTERVAL seconds or as soon as
+    AUDIT_BATCH_SIZE rows are waiting. Remaining rows are flushed at shutdown.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.batch_size = app.config["AUDIT_BATCH_SIZE"]
+        self.interval = app.config["AUDIT_FLUSH_INTERVAL"]
+        self._queue = queue.Queue(maxsize=app.config["AUDIT_QUEUE_SIZE"])
+        self._retry = []
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="audit-flusher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def put_committed(self, rows):
+        """
+        Queue rows whose transaction has just committed. Rows that do not fit
+        in the queue are inserted right away on a separate connection.
+        """
+        overflow = [row for row in rows if not self.put(row)]
+        if not overflow:
+            return
+        try:
+            self._insert(overflow)
+        except Exception as e:
+            with self._flush_lock:
+                self._retry.extend(overflow)
+            self.app.logger.error(f"Audit insert failed, {len(overflow)} row(s) kept for retry: {e}")
+
+    def put(self, row):
+        """Queue a row; returns False if the queue stayed full."""
+        try:
+            self._queue.put(row, timeout=self.app.config["AUDIT_ENQUEUE_TIMEOUT"])
+        except queue.Full:
+            self._wake.set()
+            return False
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        """Write every queued row. Returns the number of rows inserted."""
+        with self._flush_lock:
+            rows, self._retry = self._retry, []
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                return 0
+
+            try:
+                self._insert(rows)
+            except Exception as e:
+                self._retry = rows
+                self.app.logger.error(f"Audit flush failed, {len(rows)} row(s) kept for retry: {e}")
+                return 0
+            return len(rows)
+
+    def _insert(self, rows):
+        # Own connection: never commits or blocks on a request's transaction
+        with self.app.app_context(), db.engine.begin() as connection:
+            for start in range(0, len(rows), self.batch_size):
+                connection.execute(insert(AuditLog), rows[start:start + self.batch_size])
+
+    def run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+
 class AuditService:
+    """
+    AUDIT_DURABILITY selects how entries are written:
+      "transaction" (default) - added to the caller's session and committed
+                                atomically with the action being audited
+      "buffered"              - held on the caller's session until it commits
+                                (dropped on rollback), then queued and
+                                bulk-inserted in the background; entries can
+                                be lost if the process is killed
+      "sync"                  - committed immediately, one transaction each
+    """
+
+    @staticmethod
+    def init_app(app):
+        if app.config.get("AUDIT_DURABILITY") == "buffered":
+            app.extensions["audit_buffer"] = AuditBuffer(app).start()
+            if not event.contains(db.session, "after_commit", AuditService._after_commit):
+                event.listen(db.session, "after_commit", AuditService._after_commit)
+                event.listen(db.session, "after_rollback", AuditService._after_rollback)
+
+    @staticmethod
+    def _buffer():
+        return current_app.extensions.get("audit_buffer")
+
     @staticmethod
     def log_action(user_id, action, details=None):
+        if AuditService._buffer() is not None:
+            # Queued only once the caller's transaction commits
+            row = {"user_id": user_id, "action": action, "details": details, "timestamp": datetime.utcnow()}
+            db.session.info.setdefault("audit_rows", []).append(row)
+            return None
+
         log = AuditLog(user_id=user_id, action=action, details=details)
         db.session.add(log)
-        db.session.commit()
+        if current_app.config.get("AUDIT_DURABILITY") == "sync":
+            db.session.commit()
         return log
 
+    @staticmethod
+    def _after_commit(session):
+        rows = session.info.pop("audit_rows", None)
+        if rows:
+            AuditService._buffer().put_committed(rows)
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop("audit_rows", None)
+
+    @staticmethod
+    def flush():
+        buffer = AuditService._buffer()
+        return buffer.flush() if buffer is not None else 0
+
     @staticmethod
     def get_logs(user_id=None, limit=100):
+        AuditService.flush()
         query = AuditLog.query.order_by(AuditLog.timestamp.desc())
         if user_id:
             query = query.filter_by(user_id=user_id)
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db
+from models import FileRecord
+from merkle import merkle_root, merkle_proofs
+from services.blockchain_service import BlockchainService, _append_lock
+from services.cert_service import CertService
+from services.stats_cache import stats_cache
+
+
+class BatchService:
+    """
+    Queue file registrations and seal them into a single block.
+    A FileRecord without a block_index is pending; sealing assigns every
+    pending record its block and its leaf position in the block's Merkle tree.
+    """
+
+    @staticmethod
+    def pending_query():
+        return FileRecord.query.filter(FileRecord.block_index.is_(None)).order_by(FileRecord.id.asc())
+
+    @staticmethod
+    def should_seal():
+        pending = BatchService.pending_query()
+        if pending.count() >= current_app.config["BLOCK_BATCH_SIZE"]:
+            return True
+
+        oldest = pending.first()
+        max_wait = timedelta(seconds=current_app.config["BLOCK_BATCH_MAX_WAIT"])
+        return oldest is not None and oldest.created_at <= datetime.utcnow() - max_wait
+
+    @staticmethod
+    def maybe_seal():
+        """
+        Seal the pending queue if the size or time threshold is reached.
+        Returns the sealed block, or None.
+        """
+        if not BatchService.should_seal():
+            return None
+        return BatchService.seal()
+
+    @staticmethod
+    def block_data(records):
+        """Payload of a block holding `records` as the leaves of its Merkle tree."""
+        filehashes = [r.filehash for r in records]
+        return {
+            "type": "batch",
+            "merkle_root": merkle_root(filehashes),
+            "filehashes": filehashes,
+            "files": [
+                {
+                    "file_id": r.id,
+                    "filehash": r.filehash,
+                    "owner_id": r.user_id,
+                    "filename": r.name,
+                    "uploaded_at": r.created_at.isoformat()
+                }
+                for r in records
+            ]
+        }
+
+    @staticmethod
+    def assign_leaves(records, block_index: int):
+        """Point each record at its block, leaf position and inclusion proof."""
+        proofs = merkle_proofs([r.filehash for r in records])
+        for leaf_index, record in enumerate(records):
+            record.block_index = block_index
+            record.leaf_index = leaf_index
+            record.merkle_proof = json.dumps(proofs[leaf_index])
+
+    @staticmethod
+    def seal():
+        """
+        Seal up to BLOCK_BATCH_SIZE pending registrations into one block and
+        issue their certificates, all in one transaction. Returns the block,
+        or None if nothing is pending.
+        The chain_head lock is taken before the pending records are read, so
+        concurrent sealers in other processes (gunicorn workers, the
+        seal-pending-blocks cron) wait and then see those records as sealed.
+        """
+        with _append_lock:
+            try:
+                BlockchainService._lock_head()
+                records = BatchService.pending_query().limit(current_app.config["BLOCK_BATCH_SIZE"]).all()
+                if not records:
+                    db.session.rollback()
+                    return None
+
+                block = BlockchainService.add_block(BatchService.block_data(records), commit=False)
+                BatchService.assign_leaves(records, block.index)
+
+                newly_verified = []
+                for record in records:
+                    if not record.is_verified:
+                        newly_verified.append(record.user_id)
+                    CertService.issue_certificate(record.user_id, record.id, commit=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        for owner_id in newly_verified:
+            stats_cache.certificate_issued(owner_id)
+
+        return block
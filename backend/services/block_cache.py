@@ -0,0 +1,102 @@
+from sqlalchemy import func
+from cache import TTLCache
+from models import Block, db
+
+
+class BlockCache:
+    """
+    In-process caches for the read-heavy explorer endpoints.
+    Sealed blocks never change, so their serialized form is cached by
+    block_hash in an LRU. Rendered /chain pages are cached too: a full page
+    with more blocks after it is immutable, and the tail page (or the
+    latest-blocks window) is reused until the chain tip moves.
+    Both caches are bounded in bytes as well as entries; blocks whose payload
+    exceeds BLOCK_CACHE_MAX_ITEM_BYTES (large batch blocks) are never cached.
+    """
+
+    def __init__(self, app=None):
+        self.blocks = TTLCache(10000, max_bytes=256 * 1024 ** 2)
+        self.pages = TTLCache(64, max_bytes=64 * 1024 ** 2)
+        self.max_item_bytes = 1024 ** 2
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.blocks = TTLCache(
+            app.config.get("BLOCK_CACHE_MAX_ENTRIES", 10000),
+            max_bytes=app.config.get("BLOCK_CACHE_MAX_BYTES", 256 * 1024 ** 2)
+        )
+        self.pages = TTLCache(
+            app.config.get("CHAIN_PAGE_CACHE_MAX_ENTRIES", 64),
+            max_bytes=app.config.get("CHAIN_PAGE_CACHE_MAX_BYTES", 64 * 1024 ** 2)
+        )
+        self.max_item_bytes = app.config.get("BLOCK_CACHE_MAX_ITEM_BYTES", 1024 ** 2)
+        app.extensions["block_cache"] = self
+
+    # ---------------- BLOCKS ----------------
+    def block_json(self, block: Block):
+        """Block.to_json(), memoised by block hash."""
+        size = self._block_size(block)
+        if size > self.max_item_bytes:
+            return block.to_json()
+
+        key = ("json", block.block_hash)
+        text = self.blocks.get(key)
+        if text is None:
+            text = block.to_json()
+            self.blocks.set(key, text, size=size)
+        return text
+
+    def block_dict(self, block: Block):
+        """Block.to_dict(), memoised by block hash. Treat the result as read-only."""
+        size = self._block_size(block)
+        if size > self.max_item_bytes:
+            return block.to_dict()
+
+        key = ("dict", block.block_hash)
+        data = self.blocks.get(key)
+        if data is None:
+            data = block.to_dict()
+            self.blocks.set(key, data, size=size)
+        return data
+
+    @staticmethod
+    def _block_size(block: Block):
+        """Approximate footprint of a cached block: its payload dominates."""
+        return len(block.data or "") + 512
+
+    # ---------------- PAGES ----------------
+    @staticmethod
+    def chain_tip():
+        """Highest block index (a lookup on the unique index of blocks.index)."""
+        return db.session.query(func.max(Block.index)).scalar()
+
+    def page(self, key, render):
+        """
+        Return a rendered page for `key`, calling render() on a miss.
+        render returns {"body": str, "next_cursor": ..., "complete": bool};
+        complete pages are kept until evicted, others only while the tip
+        stays where it was when they were rendered. The tip is only looked
+        up when a cached page is not complete.
+        """
+        entry = self.pages.get(key)
+        if entry is not None and entry["complete"]:
+            return entry
+
+        tip = self.chain_tip()
+        if entry is not None and entry["tip"] == tip:
+            return entry
+
+        entry = dict(render(), tip=tip)
+        self.pages.set(key, entry, size=len(entry["body"]))
+        return entry
+
+    def stats(self):
+        return {"blocks": self.blocks.stats(), "chain_pages": self.pages.stats()}
+
+    def clear(self):
+        self.blocks.clear()
+        self.pages.clear()
+
+
+block_cache = BlockCache()
@@ -1,7 +1,20 @@
 import hashlib
 import json
+import threading
+import time
 from datetime import datetime
-from models import Block, db
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from merkle import verify_proof
+from models import Block, BlockFileHash, ChainCheckpoint, ChainHead, FileRecord, db
+
+VALIDATION_BATCH_SIZE = 500
+CHAIN_HEAD_ID = 1
+
+# Serializes appends within one process; ChainHead serializes across processes.
+# Reentrant so a caller (batch sealing) can hold it around add_block.
+_append_lock = threading.RLock()
+
 
 class BlockchainService:
 
@@ -33,44 +46,222 @@ class BlockchainService:
                 previous_hash="0",
                 block_hash=block_hash,
                 data=data_str,
-                timestamp=dt
+                timestamp=dt,
+                block_type="genesis"
             )
 
             db.session.add(genesis)
+            if db.session.get(ChainHead, CHAIN_HEAD_ID) is None:
+                db.session.add(ChainHead(id=CHAIN_HEAD_ID, tip_index=0, tip_hash=block_hash))
             db.session.commit()
             return genesis
 
+        if db.session.get(ChainHead, CHAIN_HEAD_ID) is None:
+            BlockchainService._seed_head()
+            db.session.commit()
+
         return Block.query.order_by(Block.index.asc()).first()
 
     # ---------------- ADD BLOCK ----------------
     @staticmethod
-    def add_block(data: dict):
-        latest_block = Block.query.order_by(Block.index.desc()).first()
-        if not latest_block:
-            latest_block = BlockchainService.create_genesis_block()
+    def add_block(data: dict, commit: bool = True):
+        """
+        Append a block. Concurrent writers (threads or worker processes) are
+        serialized on the chain_head row, so each one extends the real tip.
+        With commit=False the block is only flushed: it joins the caller's
+        transaction and the chain stays locked until the caller commits.
+        """
+        with _append_lock:
+            head = BlockchainService._lock_head()
+
+            latest_block = Block.query.order_by(Block.index.desc()).first()
+            if not latest_block:
+                latest_block = BlockchainService.create_genesis_block()
+
+            new_index = latest_block.index + 1
+            dt = datetime.utcnow()
+            data_str = json.dumps(data, sort_keys=True)
+
+            new_hash = BlockchainService.calculate_hash(
+                new_index,
+                latest_block.block_hash,
+                data_str,
+                dt
+            )
+
+            block = Block(
+                index=new_index,
+                previous_hash=latest_block.block_hash,
+                block_hash=new_hash,
+                data=data_str,
+                timestamp=dt,
+                **Block.payload_columns(data)
+            )
+
+            db.session.add(block)
+            BlockchainService.index_filehashes(new_index, data)
+
+            head.tip_index = new_index
+            head.tip_hash = new_hash
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
+            return block
+
+    @staticmethod
+    def file_block_data(record: FileRecord):
+        """Payload of a single-file block; the file hash is its own Merkle root."""
+        return {
+            "type": "file",
+            "file_id": record.id,
+            "filehash": record.filehash,
+            "merkle_root": record.filehash,  # single-leaf tree
+            "owner_id": record.user_id,
+            "filename": record.name,
+            "uploaded_at": record.created_at.isoformat()
+        }
+
+    @staticmethod
+    def _lock_head():
+        """
+        Take the append lock by writing the chain_head row: a row lock on
+        PostgreSQL/MySQL, the database write lock on SQLite. It is held until
+        the current transaction commits or rolls back.
+        """
+        for _ in range(2):
+            locked = db.session.execute(
+                update(ChainHead)
+                .where(ChainHead.id == CHAIN_HEAD_ID)
+                .values(updated_at=datetime.utcnow())
+            )
+            if locked.rowcount:
+                return db.session.get(ChainHead, CHAIN_HEAD_ID)
+
+            # chain_head has not been seeded yet (normally done at startup)
+            try:
+                with db.session.begin_nested():
+                    BlockchainService._seed_head()
+            except IntegrityError:
+                pass  # another writer seeded it first; retry the update
 
-        new_index = latest_block.index + 1
-        dt = datetime.utcnow()
-        data_str = json.dumps(data, sort_keys=True)
+        raise RuntimeError("Could not acquire the chain head lock")
 
-        new_hash = BlockchainService.calculate_hash(
-            new_index,
-            latest_block.block_hash,
-            data_str,
-            dt
+    @staticmethod
+    def _seed_head():
+        tip = Block.query.order_by(Block.index.desc()).first()
+        head = ChainHead(
+            id=CHAIN_HEAD_ID,
+            tip_index=tip.index if tip else -1,
+            tip_hash=tip.block_hash if tip else "0"
         )
+        db.session.add(head)
+        db.session.flush()
+        return head
 
-        block = Block(
-            index=new_index,
-            previous_hash=latest_block.block_hash,
-            block_hash=new_hash,
-            data=data_str,
-            timestamp=dt
+    # ---------------- FILEHASH INDEX ----------------
+    @staticmethod
+    def extract_filehashes(data):
+        """
+        Return the file hashes referenced by a block payload.
+        Supports {"filehash": ...}, {"filehashes": [...]} and bare lists.
+        """
+        if isinstance(data, dict):
+            hashes = list(data.get("filehashes") or [])
+            if data.get("filehash"):
+                hashes.append(data["filehash"])
+            return hashes
+        if isinstance(data, list):
+            return [h for h in data if isinstance(h, str)]
+        return []
+
+    @staticmethod
+    def index_filehashes(block_index: int, data):
+        for filehash in set(BlockchainService.extract_filehashes(data)):
+            db.session.add(BlockFileHash(filehash=filehash, block_index=block_index))
+
+    @staticmethod
+    def find_blocks_by_filehash(filehash: str):
+        return (
+            Block.query
+            .join(BlockFileHash, BlockFileHash.block_index == Block.index)
+            .filter(BlockFileHash.filehash == filehash)
+            .order_by(Block.index.desc())
+            .all()
+        )
+
+    @staticmethod
+    def backfill_filehash_index():
+        """
+        Index blocks written before the filehash index existed.
+        Returns the number of blocks indexed.
+        """
+        indexed = db.session.query(BlockFileHash.block_index)
+        blocks = (
+            Block.query
+            .filter(Block.index.notin_(indexed))
+            .order_by(Block.index.asc())
+            .yield_per(VALIDATION_BATCH_SIZE)
         )
 
-        db.session.add(block)
+        count = 0
+        for block in blocks:
+            hashes = BlockchainService.extract_filehashes(BlockchainService.get_block_data(block))
+            if hashes:
+                BlockchainService.index_filehashes(block.index, hashes)
+                count += 1
+
         db.session.commit()
-        return block
+        return count
+
+    # ---------------- MERKLE PROOFS ----------------
+    @staticmethod
+    def get_inclusion_proof(record: FileRecord):
+        """
+        Return the Merkle inclusion proof of a file in its block,
+        or None if the file is not on chain yet.
+        """
+        if record.block_index is None:
+            return None
+
+        columns = BlockchainService._proof_columns(record.block_index)
+        return {
+            "file_id": record.id,
+            "filehash": record.filehash,
+            "block_index": record.block_index,
+            "leaf_index": record.leaf_index,
+            "merkle_root": columns.merkle_root if columns else None,
+            "proof": json.loads(record.merkle_proof) if record.merkle_proof else [],
+        }
+
+    @staticmethod
+    def verify_inclusion(record: FileRecord, filehash: str, block_index: int = None):
+        """
+        Check that `filehash` is the leaf committed for `record` in its block.
+        Reads the block's merkle_root column rather than parsing its payload,
+        so the cost does not grow with the number of files in the block;
+        validate_chain and the chain audit check that column against the
+        hashed payload. A forged stored proof cannot hash up to the genuine
+        root. Blocks written before Merkle roots existed fall back to the
+        filehash column. Returns None if the block does not exist.
+        """
+        if block_index is None:
+            block_index = record.block_index
+
+        columns = BlockchainService._proof_columns(block_index)
+        if columns is None:
+            return None
+
+        if columns.merkle_root is None:
+            return columns.filehash == filehash
+
+        proof = json.loads(record.merkle_proof) if record.merkle_proof else []
+        return verify_proof(filehash, proof, columns.merkle_root)
+
+    @staticmethod
+    def _proof_columns(block_index: int):
+        """(merkle_root, filehash) of a block without loading its payload."""
+        return db.session.query(Block.merkle_root, Block.filehash).filter(Block.index == block_index).first()
 
     # ---------------- FETCH BLOCK ----------------
     @staticmethod
@@ -87,15 +278,79 @@ class BlockchainService:
 
     # ---------------- VALIDATE CHAIN ----------------
     @staticmethod
-    def validate_chain():
-        blocks = Block.query.order_by(Block.index.asc()).all()
+    def validate_chain(full: bool = False, stop_early: bool = True):
+        """
+        Verify block linkage and hashes and return a report: the first
+        failing index and failure type, blocks checked and elapsed time.
+        By default only blocks appended after the last checkpoint are checked;
+        full=True re-verifies the whole chain from genesis. With
+        stop_early=False the scan continues and every failure is listed.
+        """
+        report = {"checked": 0}
+        failures = []
+        started = time.perf_counter()
+        for failure in BlockchainService.iter_validation(full, stop_early, report):
+            failures.append(failure)
+
+        return {
+            "valid": not failures,
+            "mode": "full" if full else "incremental",
+            "first_invalid_index": failures[0]["index"] if failures else None,
+            "failure": failures[0]["type"] if failures else None,
+            "failures": failures,
+            "blocks_checked": report["checked"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    @staticmethod
+    def iter_validation(full: bool = False, stop_early: bool = True, report: dict = None):
+        """
+        Scan the chain and yield each failure as it is found, as
+        {"index", "type", "expected", "actual"} with type one of
+        "checkpoint_mismatch", "linkage", "hash_mismatch" or "column_mismatch"
+        (a copied payload column that disagrees with the hashed payload).
+        report["checked"] counts the blocks checked so far. The checkpoint is
+        moved to the tip after a clean scan and cleared after any failure.
+        """
+        report = report if report is not None else {}
+        report["checked"] = 0
+        checkpoint = ChainCheckpoint.query.first()
+        prev = None
+        failed = False
+
+        if checkpoint and not full:
+            prev = Block.query.filter_by(index=checkpoint.block_index).first()
+            if prev is None or prev.block_hash != checkpoint.block_hash:
+                BlockchainService._clear_checkpoint()
+                yield {
+                    "index": checkpoint.block_index,
+                    "type": "checkpoint_mismatch",
+                    "expected": checkpoint.block_hash,
+                    "actual": prev.block_hash if prev else None
+                }
+                if stop_early:
+                    return
+                # The verified prefix cannot be trusted any more: rescan it
+                failed, prev = True, None
 
-        for i in range(1, len(blocks)):
-            current = blocks[i]
-            prev = blocks[i - 1]
+        if prev is None:
+            prev = Block.query.order_by(Block.index.asc()).first()
+            if prev is None:
+                return
+            report["checked"] += 1
 
+        blocks = (
+            Block.query
+            .filter(Block.index > prev.index)
+            .order_by(Block.index.asc())
+            .yield_per(VALIDATION_BATCH_SIZE)
+        )
+
+        for current in blocks:
+            report["checked"] += 1
+            problems = []
             if current.previous_hash != prev.block_hash:
-                return False
+                problems.append(("linkage", prev.block_hash, current.previous_hash))
 
             recalculated_hash = BlockchainService.calculate_hash(
                 current.index,
@@ -103,8 +358,54 @@ class BlockchainService:
                 current.data,
                 current.timestamp
             )
-
             if current.block_hash != recalculated_hash:
-                return False
+                problems.append(("hash_mismatch", recalculated_hash, current.block_hash))
+            else:
+                mismatch = BlockchainService.column_mismatch(current.index, current.data, current)
+                if mismatch:
+                    problems.append(("column_mismatch", *mismatch))
+
+            for kind, expected, actual in problems:
+                if not failed:
+                    failed = True
+                    BlockchainService._clear_checkpoint()
+                yield {"index": current.index, "type": kind, "expected": expected, "actual": actual}
+                if stop_early:
+                    return
+
+            prev = current
+
+        if not failed:
+            BlockchainService._save_checkpoint(prev)
+
+    @staticmethod
+    def column_mismatch(index, data_str, row):
+        """
+        Compare the copied payload columns of a block row (anything with
+        those attributes) with its payload. Returns (expected, actual) dicts
+        of the differing columns, or None if they agree.
+        """
+        expected = Block.expected_columns(index, data_str)
+        differing = [name for name in Block.COPIED_COLUMNS if getattr(row, name) != expected[name]]
+        if not differing:
+            return None
+        return {n: expected[n] for n in differing}, {n: getattr(row, n) for n in differing}
+
+    @staticmethod
+    def _save_checkpoint(block: Block):
+        checkpoint = ChainCheckpoint.query.first()
+        if not checkpoint:
+            checkpoint = ChainCheckpoint()
+            db.session.add(checkpoint)
 
-        return True
+        checkpoint.block_index = block.index
+        checkpoint.block_hash = block.block_hash
+        checkpoint.verified_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def _clear_checkpoint():
+        # A failed check invalidates everything verified so far, so the next
+        # call falls back to a full scan instead of trusting the old tip.
+        ChainCheckpoint.query.delete()
+        db.session.commit()
@@ -1,19 +1,24 @@
 import uuid
 from datetime import datetime
-from flask import current_app
-from extensions import db, mail
+from extensions import db
 from models import Certificate, FileRecord, User
+from services.block_cache import block_cache
 from services.blockchain_service import BlockchainService
 from services.audit_service import AuditService
-from flask_mail import Message
+from services.email_service import EmailService
+from services.stats_cache import stats_cache
 
 
 class CertService:
     @staticmethod
-    def issue_certificate(user_id: int, file_id: int):
+    def issue_certificate(user_id: int, file_id: int, commit: bool = True, notify: bool = True):
         """
         Issue a blockchain certificate for a file.
         Marks the file as verified after successful issuance.
+        With commit=False everything (block, certificate, audit entry, email)
+        joins the caller's transaction; the caller commits and reports
+        stats_cache.certificate_issued for files that were not yet verified.
+        notify=False skips the per-certificate email.
         """
         # Fetch file and user
         file = FileRecord.query.get(file_id)
@@ -26,17 +31,10 @@ class CertService:
 
         # Ensure blockchain block exists for this file
         if file.block_index is None:
-            block_data = {
-                "type": "file",
-                "file_id": file.id,
-                "filehash": file.filehash,
-                "owner_id": user.id,
-                "filename": file.name,
-                "uploaded_at": file.created_at.isoformat()
-            }
-            block = BlockchainService.add_block(block_data)
+            block = BlockchainService.add_block(BlockchainService.file_block_data(file), commit=False)
             file.block_index = block.index
-            db.session.commit()
+            file.leaf_index = 0
+            file.merkle_proof = "[]"
         else:
             block = BlockchainService.get_block_by_index(file.block_index)
 
@@ -54,26 +52,28 @@ class CertService:
         db.session.add(cert)
 
         # ✅ Mark file as verified
+        was_verified = file.is_verified
         file.is_verified = True
 
-        db.session.commit()
-
-        # Log audit action
+        # Log audit action (committed together with the certificate)
         AuditService.log_action(user_id, "CERTIFICATE_ISSUED", f"Certificate {cert_id} for file {file.name}")
 
-        # Send email notification (optional)
-        try:
-            msg = Message(
+        # Queue email notification (delivered by the outbox worker)
+        if notify:
+            EmailService.queue_email(
                 subject=f"Certificate Issued for {file.name}",
                 recipients=[user.email],
                 body=f"Hello {user.username},\n\n"
                      f"Your certificate ID is {cert_id}.\n"
                      f"File: {file.name}\n"
-                     f"Blockchain Index: {file.block_index}\n\nThank you."
+                     f"Blockchain Index: {file.block_index}\n\nThank you.",
+                commit=False
             )
-            mail.send(msg)
-        except Exception as e:
-            current_app.logger.warning(f"Failed to send certificate email: {e}")
+
+        if commit:
+            db.session.commit()
+            if not was_verified:
+                stats_cache.certificate_issued(file.user_id)
 
         return cert
 
@@ -89,7 +89,9 @@ class CertService:
         block = BlockchainService.get_block_by_index(cert.blockchain_index)
         return {
             "certificate": cert.to_dict(),
-            "block": block.to_dict() if block else None,
+            "block": block_cache.block_dict(block) if block else None,
+            "inclusion_proof": BlockchainService.get_inclusion_proof(cert.file),
+            "included": BlockchainService.verify_inclusion(cert.file, cert.file.filehash, cert.blockchain_index),
         }
 
     @staticmethod
@@ -0,0 +1,127 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from sqlalchemy import create_engine, func, select
+from models import Block, db
+from services.blockchain_service import BlockchainService, VALIDATION_BATCH_SIZE
+
+
+def _verify_segment(database_uri: str, start: int, end: int):
+    """
+    Recompute hashes, check linkage and compare the copied payload columns
+    for blocks with start <= index < end.
+    Runs in a worker process with its own engine. Linkage into the first
+    block of the segment is left to the caller, which knows the previous
+    segment's last hash.
+    """
+    engine = create_engine(database_uri)
+    blocks = Block.__table__
+    copied = [blocks.c[name] for name in Block.COPIED_COLUMNS]
+    query = (
+        select(blocks.c.index, blocks.c.previous_hash, blocks.c.block_hash, blocks.c.data, blocks.c.timestamp, *copied)
+        .where(blocks.c.index >= start, blocks.c.index < end)
+        .order_by(blocks.c.index.asc())
+        .execution_options(yield_per=VALIDATION_BATCH_SIZE)
+    )
+
+    result = {"start": start, "end": end, "checked": 0, "failure": None, "first": None, "last_hash": None}
+    try:
+        with engine.connect() as connection:
+            for row in connection.execute(query):
+                index, previous_hash, block_hash, data, timestamp = row[:5]
+                if result["first"] is None:
+                    result["first"] = (index, previous_hash)
+                elif previous_hash != result["last_hash"]:
+                    result["failure"] = (index, "linkage")
+                    break
+
+                result["checked"] += 1
+                if block_hash != BlockchainService.calculate_hash(index, previous_hash, data, timestamp):
+                    result["failure"] = (index, "hash_mismatch")
+                    break
+                if BlockchainService.column_mismatch(index, data, row):
+                    result["failure"] = (index, "column_mismatch")
+                    break
+                result["last_hash"] = block_hash
+    finally:
+        engine.dispose()
+    return result
+
+
+class ChainAuditService:
+    """
+    Full chain audit spread over a process pool. The chain is split into
+    index ranges that workers verify independently; links between ranges are
+    checked here once every range is done.
+    """
+
+    @staticmethod
+    def audit(workers: int = None, segment_size: int = None):
+        """
+        Re-verify the whole chain. Returns a report with the first broken
+        index (None if the chain is valid) and throughput figures.
+        """
+        config = current_app.config
+        workers = workers or config["CHAIN_AUDIT_WORKERS"] or os.cpu_count() or 1
+        started = time.perf_counter()
+
+        low, high = db.session.query(func.min(Block.index), func.max(Block.index)).one()
+        segments = []
+        if low is not None:
+            # Several segments per worker keeps the pool busy when ranges are uneven
+            size = segment_size or max(
+                config["CHAIN_AUDIT_SEGMENT_SIZE"],
+                math.ceil((high - low + 1) / (workers * 4))
+            )
+            segments = [(start, min(start + size, high + 1)) for start in range(low, high + 1, size)]
+
+        database_uri = db.engine.url.render_as_string(hide_password=False)
+        if workers == 1 or len(segments) <= 1:
+            results = [_verify_segment(database_uri, start, end) for start, end in segments]
+        else:
+            # spawn: never fork a process that runs the email/audit threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                starts, ends = zip(*segments)
+                results = list(pool.map(_verify_segment, [database_uri] * len(segments), starts, ends))
+
+        failure = ChainAuditService._first_failure(results)
+        if failure is None and results:
+            BlockchainService._save_checkpoint(BlockchainService.get_block_by_index(high))
+        elif failure is not None:
+            BlockchainService._clear_checkpoint()
+
+        checked = sum(r["checked"] for r in results)
+        elapsed = time.perf_counter() - started
+        return {
+            "valid": failure is None,
+            "first_invalid_index": failure[0] if failure else None,
+            "failure": failure[1] if failure else None,
+            "blocks_checked": checked,
+            "segments": len(segments),
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "blocks_per_second": round(checked / elapsed) if elapsed else None
+        }
+
+    @staticmethod
+    def _first_failure(results):
+        """Earliest (index, reason) across segment failures and broken boundaries."""
+        failures = [r["failure"] for r in results if r["failure"]]
+
+        last_hash = None
+        for r in results:
+            if r["first"] is None:
+                continue  # empty index range
+            index, previous_hash = r["first"]
+            if last_hash is not None and previous_hash != last_hash:
+                failures.append((index, "linkage"))
+            if r["failure"]:
+                break  # last_hash of a failed segment is not meaningful
+            last_hash = r["last_hash"]
+
+        # Report linkage before a hash mismatch at the same index, like validate_chain
+        return min(failures, key=lambda f: (f[0], f[1] != "linkage")) if failures else None
@@ -1,8 +1,216 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
 from flask_mail import Message
-from extensions import mail
+from sqlalchemy import update
+from extensions import db, mail
+
+PURGE_INTERVAL = 3600  # seconds between retention sweeps of the outbox
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)  # JSON list of addresses
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def to_message(self):
+        return Message(subject=self.subject, recipients=json.loads(self.recipients), body=self.body)
+
+
+class SMTPTransport:
+    """Sends a batch over one pooled Flask-Mail SMTP connection."""
+
+    def open(self):
+        return mail.connect()
+
+
+class StubTransport:
+    """Collects messages in memory instead of sending them (tests/local dev)."""
+
+    def __init__(self):
+        self.sent = []
+
+    def open(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+stub_transport = StubTransport()
+
 
 class EmailService:
     @staticmethod
     def send_email(subject, recipients, body):
         msg = Message(subject=subject, recipients=recipients, body=body)
-        mail.send(msg)
\ No newline at end of file
+        mail.send(msg)
+
+    @staticmethod
+    def queue_email(subject, recipients, body, commit=True):
+        """
+        Store an email in the outbox; the background worker delivers it.
+        With commit=False the entry joins the caller's transaction, so it is
+        only sent if that transaction commits.
+        """
+        entry = EmailOutbox(subject=subject, recipients=json.dumps(list(recipients)), body=body)
+        db.session.add(entry)
+        if commit:
+            db.session.commit()
+        return entry
+
+    @staticmethod
+    def transport():
+        if current_app.config.get("MAIL_TRANSPORT") == "stub":
+            return stub_transport
+        return SMTPTransport()
+
+    @staticmethod
+    def _claim_batch(now):
+        """
+        Lease up to EMAIL_BATCH_SIZE due entries. Pushing next_attempt_at past
+        the lease keeps other workers off them; if this worker dies they
+        become due again once the lease expires.
+        """
+        config = current_app.config
+        lease_until = now + timedelta(seconds=config["EMAIL_LEASE_SECONDS"])
+        candidates = (
+            EmailOutbox.query
+            .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id.asc())
+            .limit(config["EMAIL_BATCH_SIZE"])
+            .all()
+        )
+
+        claimed = []
+        for entry in candidates:
+            result = db.session.execute(
+                update(EmailOutbox)
+                .where(
+                    EmailOutbox.id == entry.id,
+                    EmailOutbox.status == "pending",
+                    EmailOutbox.next_attempt_at == entry.next_attempt_at
+                )
+                .values(next_attempt_at=lease_until)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                claimed.append(entry)
+        db.session.commit()
+        return claimed
+
+    @staticmethod
+    def process_outbox():
+        """
+        Deliver one batch of due emails over a single connection.
+        Failures are retried with exponential backoff up to EMAIL_MAX_ATTEMPTS.
+        Returns the number of entries processed.
+        """
+        now = datetime.utcnow()
+        batch = EmailService._claim_batch(now)
+        if not batch:
+            return 0
+
+        attempted = set()
+        try:
+            with EmailService.transport().open() as connection:
+                for entry in batch:
+                    attempted.add(entry.id)
+                    try:
+                        connection.send(entry.to_message())
+                        entry.status = "sent"
+                        entry.sent_at = datetime.utcnow()
+                        entry.last_error = None
+                    except Exception as e:
+                        EmailService._schedule_retry(entry, e)
+        except Exception as e:
+            # Connecting (or closing) failed: entries not tried yet are retried later;
+            # attempted ones were already sent or rescheduled above
+            for entry in batch:
+                if entry.id not in attempted:
+                    EmailService._schedule_retry(entry, e)
+
+        db.session.commit()
+        return len(batch)
+
+    @staticmethod
+    def purge_finished(now=None):
+        """
+        Delete sent and failed entries older than EMAIL_RETENTION_DAYS; their
+        bodies may hold one-time codes. Returns the number of rows deleted.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=current_app.config["EMAIL_RETENTION_DAYS"])
+        deleted = EmailOutbox.query.filter(
+            EmailOutbox.status.in_(("sent", "failed")),
+            EmailOutbox.created_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    @staticmethod
+    def _schedule_retry(entry, error):
+        config = current_app.config
+        entry.attempts += 1
+        entry.last_error = str(error)
+        if entry.attempts >= config["EMAIL_MAX_ATTEMPTS"]:
+            entry.status = "failed"
+            current_app.logger.error(f"Giving up on email {entry.id}: {error}")
+        else:
+            backoff = config["EMAIL_RETRY_BACKOFF"] * (2 ** (entry.attempts - 1))
+            entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff)
+
+
+class EmailWorker:
+    """Background thread draining the outbox for one app instance."""
+
+    def __init__(self, app):
+        self.app = app
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="email-outbox", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def run(self):
+        interval = self.app.config["EMAIL_POLL_INTERVAL"]
+        next_purge = 0
+        while not self._stop.is_set():
+            processed = 0
+            try:
+                with self.app.app_context():
+                    processed = EmailService.process_outbox()
+                    if time.monotonic() >= next_purge:
+                        EmailService.purge_finished()
+                        next_purge = time.monotonic() + PURGE_INTERVAL
+            except Exception as e:
+                self.app.logger.warning(f"Email outbox worker error: {e}")
+            finally:
+                with self.app.app_context():
+                    db.session.remove()
+
+            # Keep draining while there is work, otherwise poll
+            if not processed:
+                self._stop.wait(interval)
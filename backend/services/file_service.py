@@ -1,30 +1,239 @@
-import hashlib
-from models import FileRecord, db
-from blockchain import Blockchain
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+from extensions import db
+from models import FileRecord, User
+from services.audit_service import AuditService
+from services.batch_service import BatchService
+from services.blockchain_service import BlockchainService
+from services.cert_service import CertService
+from services.email_service import EmailService
+from services.stats_cache import stats_cache
+from services.storage_service import StorageService
 
-blockchain = Blockchain()
 
-def hash_file(file_data):
-    return hashlib.sha256(file_data).hexdigest()
+class FileService:
+    """
+    Upload registration as a single unit of work: the FileRecord, its block,
+    certificate, audit entries and notification email are committed together.
+    If anything fails the transaction is rolled back, so no half-registered
+    file is left behind; a blob it stored is reclaimed by StorageService.sweep.
+    """
 
-def save_file_record(file_data, name, user_id):
-    file_hash = hash_file(file_data)
+    @staticmethod
+    def register_upload(user_id, filename: str, file_stream):
+        """
+        Store and register an upload. Returns (record, certificate); the
+        certificate is None while the record waits for a batch block.
+        Raises ValueError if the user already has a file with this name.
+        """
+        if FileRecord.query.filter_by(user_id=user_id, name=filename).first():
+            raise ValueError("File with this name already exists")
 
-    new_block = blockchain.add_block(file_hash, user_id)
+        # Content-addressed: duplicate content reuses the existing blob
+        file_path, file_hash, size, _ = StorageService.store(file_stream)
 
-    file_record = FileRecord(
-        name=name,
-        file_hash=file_hash,
-        user_id=user_id,
-        block_index=new_block.index,
-        block_hash=new_block.hash
-    )
-    db.session.add(file_record)
-    db.session.commit()
+        batched = current_app.config["BLOCK_BATCH_ENABLED"]
+        try:
+            record = FileRecord(
+                user_id=user_id,
+                name=filename,
+                filehash=file_hash,
+                storage_uri=file_path,
+                size=size
+            )
+            db.session.add(record)
+            db.session.flush()
+            AuditService.log_action(user_id, "UPLOAD", f"File: {filename}")
 
-    return file_record
+            cert = None
+            if not batched:
+                block = BlockchainService.add_block(BlockchainService.file_block_data(record), commit=False)
+                record.block_index = block.index
+                record.leaf_index = 0
+                record.merkle_proof = "[]"
+                cert = CertService.issue_certificate(user_id, record.id, commit=False)
 
-def verify_file(file_data):
-    file_hash = hash_file(file_data)
-    record = FileRecord.query.filter_by(file_hash=file_hash).first()
-    return record
+            db.session.commit()
+        except Exception as e:
+            # A blob stored here is left for the sweep: another upload may
+            # already have deduplicated onto it
+            db.session.rollback()
+            FileService._raise_if_name_taken(e, user_id, [filename])
+            raise
+
+        stats_cache.file_uploaded(user_id)
+        if cert is not None:
+            stats_cache.certificate_issued(user_id)
+        return record, cert
+
+    @staticmethod
+    def archive_members(archive_streams):
+        """
+        List the files of zip archives as (filename, open_stream) pairs.
+        Directory structure is flattened. Raises ValueError for a bad archive,
+        a member declaring more than BULK_UPLOAD_MAX_FILE_SIZE bytes, or
+        members declaring more than BULK_UPLOAD_MAX_UNPACKED_SIZE in total.
+        Declared sizes are only a first check: zipfile stops a member at its
+        declared size and the store counts the bytes actually read.
+        """
+        config = current_app.config
+        max_file_size = config["BULK_UPLOAD_MAX_FILE_SIZE"]
+        max_unpacked = config["BULK_UPLOAD_MAX_UNPACKED_SIZE"]
+
+        members, unpacked = [], 0
+        for archive_stream in archive_streams:
+            try:
+                archive = zipfile.ZipFile(archive_stream)
+            except zipfile.BadZipFile as e:
+                raise ValueError("Invalid zip archive") from e
+
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.file_size > max_file_size:
+                    raise ValueError(f"Archive member {info.filename} exceeds the {max_file_size} byte limit")
+                unpacked += info.file_size
+                if unpacked > max_unpacked:
+                    raise ValueError(f"Archives unpack to more than {max_unpacked} bytes")
+                members.append((secure_filename(os.path.basename(info.filename)), partial(archive.open, info)))
+        return members
+
+    @staticmethod
+    def register_bulk(user_id, uploads):
+        """
+        Register many files as one block in one transaction.
+        `uploads` is a list of (filename, open_stream) pairs. Files are
+        streamed into the store and hashed by BULK_UPLOAD_WORKERS threads,
+        then every accepted file becomes a leaf of a single batch block with
+        its own certificate; the owner gets one summary email.
+        Returns (results, block): one result dict per upload, in input order,
+        and the block (None if nothing was accepted).
+        """
+        results = [{"name": name} for name, _ in uploads]
+        taken = FileService._existing_names(user_id, {name for name, _ in uploads if name})
+
+        accepted = []
+        for i, (name, _) in enumerate(uploads):
+            if not name:
+                results[i].update(status="rejected", error="Invalid file name")
+            elif name in taken:
+                results[i].update(status="rejected", error="File with this name already exists")
+            else:
+                taken.add(name)
+                accepted.append(i)
+
+        stored = FileService._store_parallel(uploads, accepted, results)
+        if not stored:
+            return results, None
+
+        try:
+            records = []
+            for i, (path, filehash, size, _) in stored:
+                record = FileRecord(user_id=user_id, name=uploads[i][0], filehash=filehash, storage_uri=path, size=size)
+                db.session.add(record)
+                records.append(record)
+            db.session.flush()
+
+            for record in records:
+                AuditService.log_action(user_id, "UPLOAD", f"File: {record.name}")
+
+            block = BlockchainService.add_block(BatchService.block_data(records), commit=False)
+            BatchService.assign_leaves(records, block.index)
+            certs = [
+                CertService.issue_certificate(user_id, record.id, commit=False, notify=False)
+                for record in records
+            ]
+
+            user = db.session.get(User, int(user_id))
+            EmailService.queue_email(
+                subject=f"{len(records)} Certificates Issued",
+                recipients=[user.email],
+                body=f"Hello {user.username},\n\n"
+                     f"{len(records)} files were registered in blockchain block {block.index}.\n"
+                     "Their certificates are listed on your dashboard.\n\nThank you.",
+                commit=False
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()  # stored blobs are left for the sweep, as in register_upload
+            FileService._raise_if_name_taken(e, user_id, [uploads[i][0] for i, _ in stored])
+            raise
+
+        stats_cache.file_uploaded(user_id, count=len(records))
+        stats_cache.certificate_issued(user_id, count=len(records))
+
+        for (i, _), record, cert in zip(stored, records, certs):
+            results[i].update(
+                status="registered",
+                file={
+                    "id": record.id,
+                    "name": record.name,
+                    "filehash": record.filehash,
+                    "size": record.size,
+                    "created_at": record.created_at.isoformat(),
+                    "verified": True,
+                    "leaf_index": record.leaf_index
+                },
+                certificate=cert.to_dict()
+            )
+        return results, block
+
+    @staticmethod
+    def _raise_if_name_taken(error, user_id, names):
+        """
+        Turn an IntegrityError caused by a concurrent upload under one of
+        `names` into ValueError. Any other constraint failure is left for
+        the caller to re-raise.
+        """
+        if isinstance(error, IntegrityError) and FileService._existing_names(user_id, names):
+            raise ValueError("File with this name already exists") from error
+
+    @staticmethod
+    def _existing_names(user_id, names, chunk_size=500):
+        """The subset of `names` the user already has a file under."""
+        names = list(names)
+        taken = set()
+        for start in range(0, len(names), chunk_size):
+            rows = db.session.query(FileRecord.name).filter(
+                FileRecord.user_id == user_id,
+                FileRecord.name.in_(names[start:start + chunk_size])
+            )
+            taken.update(name for name, in rows)
+        return taken
+
+    @staticmethod
+    def _store_parallel(uploads, indexes, results):
+        """
+        Store uploads[i] for each i in `indexes` on a thread pool; hashlib
+        releases the GIL on large buffers, so hashing runs in parallel.
+        Returns [(i, store result)]; failures are recorded in `results`.
+        """
+        upload_dir = StorageService.upload_dir()
+        chunk_size = current_app.config["UPLOAD_CHUNK_SIZE"]
+        max_size = current_app.config["BULK_UPLOAD_MAX_FILE_SIZE"]
+
+        def store(i):
+            stream = uploads[i][1]()
+            try:
+                return StorageService.store_at(upload_dir, stream, chunk_size, max_size)
+            finally:
+                stream.close()
+
+        with ThreadPoolExecutor(max_workers=current_app.config["BULK_UPLOAD_WORKERS"]) as pool:
+            futures = [(i, pool.submit(store, i)) for i in indexes]
+
+        stored = []
+        for i, future in futures:
+            try:
+                stored.append((i, future.result()))
+            except (ValueError, zipfile.BadZipFile) as e:
+                results[i].update(status="rejected", error=str(e))
+            except Exception as e:
+                current_app.logger.error(f"Bulk upload could not store {uploads[i][0]}: {e}")
+                results[i].update(status="rejected", error="Could not store file")
+        return stored
@@ -0,0 +1,62 @@
+from flask import g, has_app_context
+from sqlalchemy import exists
+from sqlalchemy.orm import aliased
+from extensions import db
+from models import FileRecord, FileShare
+
+OWNER = "owner"
+SHARED = "shared"
+
+
+class PermissionService:
+    """
+    Answers "can user U access file F" with one query on the files primary
+    key plus an EXISTS probe of ix_file_shares_file_receiver. Answers are
+    memoised on flask.g, so they live for one request (or app context) only
+    and a revoked share is never served from cache to a later request.
+    """
+
+    @staticmethod
+    def shared_with(user_id):
+        """EXISTS clause: the correlated FileRecord is shared with user_id."""
+        # Aliased so it still correlates when the outer query joins file_shares too
+        share = aliased(FileShare)
+        return exists().where(share.file_id == FileRecord.id, share.receiver_id == int(user_id))
+
+    @staticmethod
+    def resolve(user_id, file_id):
+        """
+        Returns (record, access): access is OWNER, SHARED or None.
+        record is None if the file does not exist.
+        """
+        key = (int(user_id), int(file_id))
+        cache = g.setdefault("file_access", {}) if has_app_context() else {}
+        if key in cache:
+            return cache[key]
+
+        row = (
+            db.session.query(FileRecord, PermissionService.shared_with(user_id).label("shared"))
+            .filter(FileRecord.id == int(file_id))
+            .first()
+        )
+        if row is None:
+            result = (None, None)
+        else:
+            record, shared = row
+            if record.user_id == int(user_id):
+                result = (record, OWNER)
+            else:
+                result = (record, SHARED if shared else None)
+
+        cache[key] = result
+        return result
+
+    @staticmethod
+    def can_access(user_id, file_id):
+        return PermissionService.resolve(user_id, file_id)[1] is not None
+
+    @staticmethod
+    def forget(user_id, file_id):
+        """Drop a memoised answer after a share is added or removed in this request."""
+        if has_app_context():
+            g.setdefault("file_access", {}).pop((int(user_id), int(file_id)), None)
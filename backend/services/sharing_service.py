@@ -2,32 +2,46 @@ from extensions import db
 from models import FileShare, User, FileRecord
 from services.email_service import EmailService
 from services.audit_service import AuditService
-from sqlalchemy.orm import joinedload
+from services.permission_service import PermissionService
+from services.stats_cache import stats_cache
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import contains_eager, joinedload
 
 class ShareService:
     @staticmethod
     def share_file(sender_id: int, receiver_email: str, file_id: int):
-        # Find receiver
-        receiver = User.query.filter_by(email=receiver_email).first()
-        if not receiver:
-            raise ValueError("Receiver not found")
-
-        # Find file
-        record = FileRecord.query.get(file_id)
-        if not record:
+        # File (if the sender may access it), receiver and any existing share in one query
+        row = (
+            db.session.query(
+                FileRecord,
+                User,
+                FileShare.id,
+                PermissionService.shared_with(sender_id).label("sender_has_share")
+            )
+            .select_from(FileRecord)
+            .outerjoin(User, User.email == receiver_email)
+            .outerjoin(FileShare, and_(
+                FileShare.file_id == FileRecord.id,
+                FileShare.receiver_id == User.id,
+                FileShare.sender_id == int(sender_id)
+            ))
+            .filter(FileRecord.id == int(file_id))
+            .first()
+        )
+        if row is None:
             raise ValueError("File not found")
+        record, receiver, existing_id, sender_has_share = row
+        if record.user_id != int(sender_id) and not sender_has_share:
+            raise ValueError("File not found")
+
+        if receiver is None:
+            raise ValueError("Receiver not found")
 
         # Prevent sharing to self
-        if receiver.id == sender_id:
+        if receiver.id == int(sender_id):
             raise ValueError("You cannot share a file with yourself")
 
-        # Check if already shared
-        existing = FileShare.query.filter_by(
-            sender_id=sender_id,
-            receiver_id=receiver.id,
-            file_id=file_id
-        ).first()
-        if existing:
+        if existing_id is not None:
             raise ValueError("This file is already shared with the user")
 
         # Create share record
@@ -37,7 +51,6 @@ class ShareService:
             file_id=file_id
         )
         db.session.add(share)
-        db.session.commit()
 
         # Log audit
         AuditService.log_action(
@@ -45,6 +58,9 @@ class ShareService:
             "SHARE",
             f"File '{record.name}' shared with {receiver.email}"
         )
+        db.session.commit()
+        PermissionService.forget(receiver.id, file_id)
+        stats_cache.file_shared(sender_id)
 
         # Send email notification
         subject = "New File Shared with You on BlockNet"
@@ -55,10 +71,7 @@ class ShareService:
             "Best regards,\n"
             "BlockNet Team"
         )
-        try:
-            EmailService.send_email(subject, [receiver.email], body)
-        except Exception as e:
-            print(f"[WARN] Email sending failed: {e}")
+        EmailService.queue_email(subject, [receiver.email], body)
 
         # Eager load related data for frontend
         return FileShare.query.options(
@@ -68,17 +81,104 @@ class ShareService:
         ).get(share.id)
 
     @staticmethod
-    def get_shared_with_user(user_id: int):
-        return FileShare.query.options(
-            joinedload(FileShare.file),
+    def share_many(sender_id: int, receiver_emails, file_ids):
+        """
+        Share every file with every receiver in one transaction: receivers,
+        files and existing shares are each resolved with one query, new
+        shares are inserted with a single executemany, and each receiver gets
+        one digest email. Files the sender cannot access, unknown emails,
+        the sender themself and existing shares are skipped and reported.
+        `file_ids` must already be ints; the route validates them.
+        """
+        sender_id = int(sender_id)
+        receiver_emails = list(dict.fromkeys(receiver_emails))
+        file_ids = list(dict.fromkeys(file_ids))
+
+        receivers = User.query.filter(User.email.in_(receiver_emails)).all()
+        records = FileRecord.query.filter(
+            FileRecord.id.in_(file_ids),
+            or_(FileRecord.user_id == sender_id, PermissionService.shared_with(sender_id))
+        ).all()
+
+        found_emails = {r.email for r in receivers}
+        receivers = [r for r in receivers if r.id != sender_id]
+        found_files = {r.id for r in records}
+
+        existing = set()
+        if receivers and records:
+            existing = set(
+                db.session.query(FileShare.file_id, FileShare.receiver_id).filter(
+                    FileShare.sender_id == sender_id,
+                    FileShare.file_id.in_(found_files),
+                    FileShare.receiver_id.in_([r.id for r in receivers])
+                )
+            )
+
+        rows = []
+        shared_by_receiver = {}
+        for receiver in receivers:
+            for record in records:
+                if (record.id, receiver.id) in existing:
+                    continue
+                rows.append({"file_id": record.id, "sender_id": sender_id, "receiver_id": receiver.id})
+                shared_by_receiver.setdefault(receiver, []).append(record)
+
+        if rows:
+            db.session.execute(insert(FileShare), rows)
+
+            for receiver, shared in shared_by_receiver.items():
+                for record in shared:
+                    AuditService.log_action(
+                        sender_id,
+                        "SHARE",
+                        f"File '{record.name}' shared with {receiver.email}"
+                    )
+                EmailService.queue_email(
+                    "New Files Shared with You on BlockNet" if len(shared) > 1 else "New File Shared with You on BlockNet",
+                    [receiver.email],
+                    ShareService._digest_body(receiver, shared),
+                    commit=False
+                )
+            db.session.commit()
+            for row in rows:
+                PermissionService.forget(row["receiver_id"], row["file_id"])
+            stats_cache.file_shared(sender_id, count=len(rows))
+
+        return {
+            "shared": len(rows),
+            "already_shared": len(existing),
+            "unknown_receivers": [e for e in receiver_emails if e not in found_emails],
+            "inaccessible_files": [f for f in file_ids if f not in found_files]
+        }
+
+    @staticmethod
+    def _digest_body(receiver, records):
+        names = "\n".join(f"  - {r.name}" for r in records)
+        return (
+            f"Hello {receiver.username},\n\n"
+            f"The following files have been shared with you by another user on BlockNet:\n"
+            f"{names}\n\n"
+            "You can view them by logging into your account.\n\n"
+            "Best regards,\n"
+            "BlockNet Team"
+        )
+
+    @staticmethod
+    def shares_query():
+        """
+        FileShare query joined to its file (so listings can filter on the
+        file name) with sender and receiver loaded eagerly.
+        """
+        return FileShare.query.join(FileShare.file).options(
+            contains_eager(FileShare.file),
             joinedload(FileShare.sender),
             joinedload(FileShare.receiver)
-        ).filter_by(receiver_id=user_id).all()
+        )
+
+    @staticmethod
+    def get_shared_with_user(user_id: int):
+        return ShareService.shares_query().filter(FileShare.receiver_id == user_id)
 
     @staticmethod
     def get_shared_by_user(user_id: int):
-        return FileShare.query.options(
-            joinedload(FileShare.file),
-            joinedload(FileShare.sender),
-            joinedload(FileShare.receiver)
-        ).filter_by(sender_id=user_id).all()
+        return ShareService.shares_query().filter(FileShare.sender_id == user_id)
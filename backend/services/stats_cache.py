@@ -0,0 +1,134 @@
+import json
+from cache import TTLCache
+
+ADMIN_STATS_KEY = "stats:admin"
+
+# Increment a counter only if the hash is still cached, so a partial
+# hash is never recreated after expiry
+_REDIS_INCR_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    for i = 1, #ARGV, 2 do
+        redis.call('hincrby', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    return 1
+end
+return 0
+"""
+
+
+def dashboard_key(user_id):
+    return f"stats:dashboard:{user_id}"
+
+
+class LocalStatsBackend:
+    """Per-process LRU with TTL."""
+
+    def __init__(self, max_entries, ttl):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, counters):
+        self._cache.set(key, dict(counters))
+
+    def incr(self, key, deltas):
+        def apply(counters):
+            counters = dict(counters)
+            for field, delta in deltas.items():
+                counters[field] = counters.get(field, 0) + delta
+            return counters
+        self._cache.update(key, apply)
+
+    def delete(self, key):
+        self._cache.pop(key)
+
+
+class RedisStatsBackend:
+    """Shared across workers through a Redis-compatible server."""
+
+    def __init__(self, url, ttl):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATS_CACHE_URL requires the 'redis' package")
+
+        self._redis = redis.Redis.from_url(url)
+        self._incr = self._redis.register_script(_REDIS_INCR_SCRIPT)
+        self._ttl = ttl
+
+    def get(self, key):
+        counters = self._redis.hgetall(key)
+        if not counters:
+            return None
+        return {k.decode(): json.loads(v) for k, v in counters.items()}
+
+    def set(self, key, counters):
+        with self._redis.pipeline() as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={k: json.dumps(v) for k, v in counters.items()})
+            pipe.expire(key, self._ttl)
+            pipe.execute()
+
+    def incr(self, key, deltas):
+        args = []
+        for field, delta in deltas.items():
+            args.extend([field, delta])
+        self._incr(keys=[key], args=args)
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+
+class StatsCache:
+    """
+    Counter cache for the dashboard and admin stats.
+    Reads fill entries on a miss; upload/share/certificate events adjust cached
+    counters in place, and events that are hard to count just invalidate.
+    Entries also expire after STATS_CACHE_TTL seconds as a safety net.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config.get("STATS_CACHE_TTL", 60)
+        url = app.config.get("STATS_CACHE_URL")
+        if url:
+            self.backend = RedisStatsBackend(url, ttl)
+        else:
+            self.backend = LocalStatsBackend(app.config.get("STATS_CACHE_MAX_ENTRIES", 10000), ttl)
+        app.extensions["stats_cache"] = self
+
+    def get_or_compute(self, key, compute):
+        counters = self.backend.get(key)
+        if counters is None:
+            counters = compute()
+            self.backend.set(key, counters)
+        return counters
+
+    def incr(self, key, **deltas):
+        self.backend.incr(key, deltas)
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.backend.delete(key)
+
+    # ---------------- EVENTS ----------------
+    def file_uploaded(self, user_id, count=1):
+        self.incr(dashboard_key(user_id), totalFiles=count, pendingVerifications=count)
+        self.incr(ADMIN_STATS_KEY, total_files=count)
+
+    def certificate_issued(self, user_id, count=1):
+        self.incr(dashboard_key(user_id), verifications=count, pendingVerifications=-count)
+
+    def file_shared(self, sender_id, count=1):
+        self.incr(dashboard_key(sender_id), sharedFiles=count)
+
+    def user_registered(self):
+        self.incr(ADMIN_STATS_KEY, total_users=1, active_users=1)
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,164 @@
+import os
+import re
+import time
+from flask import current_app
+from extensions import db
+from models import FileRecord
+from utils import stream_to_tempfile
+
+SHA256_NAME = re.compile(r"[0-9a-f]{64}")
+TEMP_PREFIX = ".upload-"
+SWEEP_BATCH_SIZE = 500
+
+
+class StorageService:
+    """
+    Content-addressed blob store for uploads.
+    Blobs live at uploads/<h[0:2]>/<h[2:4]>/<sha256>, so identical content is
+    stored once no matter who uploads it or under which name.
+
+    Blobs are never removed inline when a record goes away or a transaction
+    rolls back: a concurrent upload may just have deduplicated onto the same
+    blob without having committed yet. Unreferenced blobs are reclaimed by
+    sweep() (`flask sweep-blobs`) once they are older than a grace period;
+    store() refreshes the mtime of a blob it reuses, which keeps it out of
+    the sweep while the reusing upload commits.
+    """
+
+    @staticmethod
+    def upload_dir():
+        upload_dir = os.path.join(current_app.instance_path, "uploads")
+        os.makedirs(upload_dir, exist_ok=True)
+        return upload_dir
+
+    @staticmethod
+    def blob_path(filehash: str, upload_dir: str = None):
+        upload_dir = upload_dir or StorageService.upload_dir()
+        return os.path.join(upload_dir, filehash[:2], filehash[2:4], filehash)
+
+    @staticmethod
+    def record_path(record: FileRecord):
+        """
+        Where a record's bytes live: its storage_uri, or uploads/<name> when
+        that is not an absolute path on this host (legacy records, e.g.
+        written on Windows).
+        """
+        if record.storage_uri and os.path.isabs(record.storage_uri):
+            return record.storage_uri
+        return os.path.join(StorageService.upload_dir(), record.name)
+
+    @staticmethod
+    def store(file_stream):
+        """
+        Stream an upload into the store.
+        Returns (blob_path, filehash, size, created); created is False when
+        the content was already stored and the new copy was discarded.
+        """
+        return StorageService.store_at(
+            StorageService.upload_dir(), file_stream, current_app.config["UPLOAD_CHUNK_SIZE"]
+        )
+
+    @staticmethod
+    def store_at(upload_dir: str, file_stream, chunk_size: int, max_size: int = None):
+        """
+        Same as store() without needing an app context, for worker threads.
+        Raises ValueError if the stream yields more than max_size bytes.
+        """
+        temp_path, filehash, size = stream_to_tempfile(file_stream, upload_dir, chunk_size, max_size)
+
+        path = StorageService.blob_path(filehash, upload_dir)
+        try:
+            # Reusing the blob: mark it recently used so a running sweep keeps it
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+            return path, filehash, size, True
+
+        os.remove(temp_path)
+        return path, filehash, size, False
+
+    @staticmethod
+    def sweep(grace_seconds: int):
+        """
+        Remove stored files no FileRecord references that were last written
+        or reused more than grace_seconds ago: content-addressed blobs
+        (checked by the indexed filehash), flat legacy uploads (checked by
+        storage_uri and by file name, as record_path resolves them) and
+        temp files left by interrupted uploads.
+        Returns the number of files removed.
+        """
+        upload_dir = StorageService.upload_dir()
+        cutoff = time.time() - grace_seconds
+        blobs, legacy, removed = [], [], 0
+
+        for root, _, names in os.walk(upload_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+
+                if name.startswith(TEMP_PREFIX):
+                    removed += StorageService._unlink(path)
+                elif SHA256_NAME.fullmatch(name) and path == StorageService.blob_path(name, upload_dir):
+                    blobs.append(path)
+                elif root == upload_dir:
+                    legacy.append(path)
+
+        for start in range(0, len(blobs), SWEEP_BATCH_SIZE):
+            chunk = blobs[start:start + SWEEP_BATCH_SIZE]
+            referenced = StorageService._referenced(FileRecord.filehash, [os.path.basename(p) for p in chunk])
+            removed += sum(
+                StorageService._remove_if_idle(path, cutoff)
+                for path in chunk
+                if os.path.basename(path) not in referenced
+            )
+
+        for start in range(0, len(legacy), SWEEP_BATCH_SIZE):
+            chunk = legacy[start:start + SWEEP_BATCH_SIZE]
+            names = [os.path.basename(p) for p in chunk]
+            # record_path serves a legacy record from storage_uri or, when
+            # that is not a usable path here (e.g. written on Windows), from
+            # uploads/<name>; a file matching either is still in use
+            by_uri = StorageService._referenced(FileRecord.storage_uri, chunk)
+            by_name = StorageService._referenced(FileRecord.name, names)
+            removed += sum(
+                StorageService._unlink(path)
+                for path, name in zip(chunk, names)
+                if path not in by_uri and name not in by_name
+            )
+
+        return removed
+
+    @staticmethod
+    def _referenced(column, values):
+        return {value for value, in db.session.query(column).filter(column.in_(values)).distinct()}
+
+    @staticmethod
+    def _remove_if_idle(path, cutoff):
+        """
+        Move the blob aside first, then look at its mtime again: an upload
+        that reused it in the meantime has refreshed the mtime (put it back),
+        and one arriving after the move finds no blob and stores its own copy.
+        """
+        parked = f"{path}.sweep-{os.getpid()}"
+        try:
+            os.rename(path, parked)
+        except FileNotFoundError:
+            return 0
+
+        if os.stat(parked).st_mtime >= cutoff:
+            os.replace(parked, path)  # same content if an upload re-created it
+            return 0
+        return StorageService._unlink(parked)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return 1
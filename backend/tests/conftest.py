@@ -0,0 +1,71 @@
+import pytest
+from app import create_app
+from config import Config
+from extensions import db
+
+
+def make_config(database_uri, **overrides):
+    """Config for an app on its own database; never touches instance/app.db."""
+    return type("TestConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        "TESTING": True,
+        "JWT_SECRET_KEY": "test-only-jwt-secret-of-32-bytes!",
+        "MAIL_TRANSPORT": "stub",
+        "EMAIL_WORKER_ENABLED": False,
+        **overrides,
+    })
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def make_app(tmp_path, database_uri):
+    """Build the app with config overrides; its app context stays pushed for the test."""
+    contexts = []
+
+    def make(**overrides):
+        app = create_app(make_config(database_uri, **overrides))
+        app.instance_path = str(tmp_path)
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        return app
+
+    yield make
+    for context in reversed(contexts):
+        db.session.remove()
+        db.engine.dispose()
+        context.pop()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, name, role=None):
+    """Register `name` (optionally with a role) and return JWT auth headers."""
+    client.post("/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw"})
+    if role is not None:
+        from models import User
+        User.query.filter_by(username=name).update({"role": role})
+        db.session.commit()
+    response = client.post("/api/auth/login", json={"email": f"{name}@example.com", "password": "pw"})
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+
+def create_user(name="owner", role="user"):
+    """Insert a user directly, for service-level tests."""
+    from models import User
+    user = User(username=name, email=f"{name}@example.com", password_hash="x", role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user
@@ -0,0 +1,52 @@
+import io
+import pytest
+from models import FileRecord, User, db
+from services.audit_service import AuditLog, AuditService
+from services.cert_service import CertService
+from services.file_service import FileService
+
+
+@pytest.fixture
+def buffered_app(make_app):
+    app = make_app(AUDIT_DURABILITY="buffered", AUDIT_FLUSH_INTERVAL=3600)
+    yield app
+    app.extensions["audit_buffer"].stop()
+
+
+def _user():
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_buffered_rows_are_written_after_commit(buffered_app):
+    user = _user()
+    AuditService.log_action(user.id, "LOGIN")
+    AuditService.flush()
+    assert AuditLog.query.count() == 0  # not committed yet
+
+    db.session.commit()
+    assert AuditService.flush() == 1
+    assert [log.action for log in AuditLog.query] == ["LOGIN"]
+
+
+def test_buffered_rows_are_dropped_on_rollback(buffered_app, monkeypatch):
+    user = _user()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("certificate store unavailable")
+    monkeypatch.setattr(CertService, "issue_certificate", fail)
+
+    with pytest.raises(RuntimeError):
+        FileService.register_upload(user.id, "report.pdf", io.BytesIO(b"report"))
+
+    AuditService.flush()
+    assert FileRecord.query.count() == 0
+    assert AuditLog.query.filter_by(action="UPLOAD").count() == 0
+
+
+def test_transaction_mode_commits_with_the_action(app):
+    user = _user()
+    FileService.register_upload(user.id, "report.pdf", io.BytesIO(b"report"))
+    assert AuditLog.query.filter_by(action="UPLOAD", user_id=user.id).count() == 1
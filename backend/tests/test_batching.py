@@ -0,0 +1,49 @@
+import io
+import pytest
+from models import FileRecord
+from services.batch_service import BatchService
+from tests.conftest import login
+
+
+@pytest.fixture
+def batched_app(make_app):
+    return make_app(BLOCK_BATCH_ENABLED=True, BLOCK_BATCH_SIZE=2, BLOCK_BATCH_MAX_WAIT=3600)
+
+
+def _upload(client, headers, name, content):
+    return client.post(
+        "/api/files/upload", headers=headers,
+        data={"file": (io.BytesIO(content), name)}, content_type="multipart/form-data"
+    )
+
+
+def test_uploads_are_sealed_once_the_batch_is_full(batched_app):
+    client = batched_app.test_client()
+    headers = login(client, "owner")
+
+    first = _upload(client, headers, "a.txt", b"a")
+    assert first.status_code == 202
+    assert first.get_json()["file"]["block_index"] is None
+
+    second = _upload(client, headers, "b.txt", b"b")
+    assert second.status_code == 201
+    assert second.get_json()["file"]["block_index"] == 1
+    assert FileRecord.query.filter(FileRecord.block_index == 1).count() == 2
+
+
+def test_failed_seal_still_reports_the_committed_upload(batched_app, monkeypatch):
+    client = batched_app.test_client()
+    headers = login(client, "owner")
+    _upload(client, headers, "a.txt", b"a")
+
+    def locked():
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(BatchService, "seal", staticmethod(locked))
+
+    response = _upload(client, headers, "b.txt", b"b")
+    assert response.status_code == 202
+    assert response.get_json()["file"]["block_index"] is None
+    assert FileRecord.query.count() == 2
+
+    monkeypatch.undo()
+    assert BatchService.seal().index == 1
@@ -0,0 +1,29 @@
+import json
+from models import Block, db
+from services.blockchain_service import BlockchainService
+
+
+def test_add_block_copies_payload_fields_into_columns(app):
+    block = BlockchainService.add_block({
+        "type": "file", "file_id": 7, "filehash": "a" * 64, "owner_id": "2", "merkle_root": "b" * 64,
+    })
+
+    assert (block.block_type, block.file_id, block.filehash, block.owner_id, block.merkle_root) == (
+        "file", 7, "a" * 64, 2, "b" * 64,
+    )
+    assert {c: getattr(block, c) for c in Block.COPIED_COLUMNS} == Block.expected_columns(block.index, block.data)
+
+
+def test_to_json_matches_the_parsed_payload(app):
+    block = BlockchainService.add_block({"type": "file", "file_id": 1, "filehash": "a" * 64})
+    assert json.loads(block.to_json()) == block.to_dict()
+
+
+def test_forged_filehash_column_fails_validation(app):
+    BlockchainService.add_block({"type": "file", "filehash": "a" * 64, "file_id": 1})
+    block = BlockchainService.get_block_by_index(1)
+    block.filehash = "e" * 64
+    db.session.commit()
+
+    report = BlockchainService.validate_chain(full=True)
+    assert (report["first_invalid_index"], report["failure"]) == (1, "column_mismatch")
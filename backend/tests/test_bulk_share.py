@@ -0,0 +1,91 @@
+import io
+import pytest
+from models import FileShare
+from services.email_service import EmailOutbox
+from services.permission_service import SHARED, PermissionService
+from services.sharing_service import ShareService
+from tests.conftest import create_user, login
+
+
+def _upload(client, headers, name):
+    response = client.post(
+        "/api/files/upload", headers=headers,
+        data={"file": (io.BytesIO(name.encode()), name)}, content_type="multipart/form-data"
+    )
+    return response.get_json()["file"]["id"]
+
+
+@pytest.fixture
+def sender(client):
+    headers = login(client, "sender")
+    for name in ("alice", "bob"):
+        login(client, name)
+    return headers
+
+
+def _share(client, headers, **body):
+    return client.post("/api/share/bulk", headers=headers, json=body)
+
+
+def test_every_file_is_shared_with_every_receiver(client, sender):
+    file_ids = [_upload(client, sender, "a.txt"), _upload(client, sender, "b.txt")]
+    response = _share(client, sender, receiver_emails=["alice@example.com", "bob@example.com"], file_ids=file_ids)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body["shared"], body["already_shared"]) == (4, 0)
+    assert FileShare.query.count() == 4
+    # One digest email per receiver (on top of the upload emails)
+    digests = EmailOutbox.query.filter(EmailOutbox.subject.like("New Files Shared%")).count()
+    assert digests == 2
+
+
+def test_skipped_pairs_are_reported(client, sender):
+    file_id = _upload(client, sender, "a.txt")
+    other = login(client, "other")
+    foreign_id = _upload(client, other, "theirs.txt")
+    _share(client, sender, receiver_emails=["alice@example.com"], file_ids=[file_id])
+
+    response = _share(
+        client, sender,
+        receiver_emails=["alice@example.com", "nobody@example.com", "sender@example.com"],
+        file_ids=[file_id, foreign_id],
+    )
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["shared"] == 0 and body["already_shared"] == 1
+    assert body["unknown_receivers"] == ["nobody@example.com"]
+    assert body["inaccessible_files"] == [foreign_id]
+
+
+@pytest.mark.parametrize("body", [
+    {"receiver_emails": "alice@example.com", "file_ids": [1]},
+    {"receiver_emails": [], "file_ids": [1]},
+    {"receiver_emails": [""], "file_ids": [1]},
+    {"receiver_emails": ["alice@example.com"], "file_ids": [True]},
+    {"receiver_emails": ["alice@example.com"], "file_ids": ["1"]},
+])
+def test_malformed_requests_are_rejected(client, sender, body):
+    assert _share(client, sender, **body).status_code == 400
+    assert FileShare.query.count() == 0
+
+
+def test_pair_limit(make_app):
+    app = make_app(BULK_SHARE_MAX_PAIRS=3)
+    client = app.test_client()
+    headers = login(client, "sender")
+
+    response = _share(client, headers, receiver_emails=["a@example.com", "b@example.com"], file_ids=[1, 2])
+    assert response.status_code == 400
+    assert "pairs" in response.get_json()["error"]
+
+
+def test_new_shares_replace_memoised_denials(client, sender):
+    file_id = _upload(client, sender, "a.txt")
+    receiver = create_user("carol")
+
+    record, access = PermissionService.resolve(receiver.id, file_id)
+    assert access is None
+
+    ShareService.share_many(record.user_id, [receiver.email], [file_id])
+    assert PermissionService.resolve(receiver.id, file_id)[1] == SHARED
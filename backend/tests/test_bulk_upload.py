@@ -0,0 +1,90 @@
+import io
+import zipfile
+from models import FileRecord
+from services.blockchain_service import BlockchainService
+from tests.conftest import login
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def _bulk(client, headers, files=(), archives=()):
+    data = {
+        "files": [(io.BytesIO(content), name) for name, content in files],
+        "archive": [(archive, "upload.zip") for archive in archives],
+    }
+    return client.post("/api/files/upload/bulk", headers=headers, data=data, content_type="multipart/form-data")
+
+
+def test_files_and_archive_members_share_one_block(client):
+    headers = login(client, "owner")
+    response = _bulk(
+        client, headers,
+        files=[("a.txt", b"a"), ("b.txt", b"b")],
+        archives=[_zip({"docs/c.txt": b"c", "docs/": b""})],
+    )
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [r["name"] for r in body["results"]] == ["a.txt", "b.txt", "c.txt"]
+    assert (body["registered"], body["rejected"]) == (3, 0)
+
+    records = FileRecord.query.order_by(FileRecord.leaf_index).all()
+    assert {r.block_index for r in records} == {body["block_index"]}
+    for record in records:
+        assert BlockchainService.verify_inclusion(record, record.filehash, record.block_index)
+
+
+def test_duplicate_names_are_rejected_per_file(client):
+    headers = login(client, "owner")
+    _bulk(client, headers, files=[("a.txt", b"a")])
+
+    response = _bulk(client, headers, files=[("a.txt", b"again"), ("b.txt", b"b"), ("b.txt", b"b2")])
+    assert response.status_code == 201
+    statuses = [(r["name"], r["status"]) for r in response.get_json()["results"]]
+    assert statuses == [("a.txt", "rejected"), ("b.txt", "registered"), ("b.txt", "rejected")]
+
+
+def test_nothing_registered_is_a_400(client):
+    headers = login(client, "owner")
+    _bulk(client, headers, files=[("a.txt", b"a")])
+
+    response = _bulk(client, headers, files=[("a.txt", b"again")])
+    assert response.status_code == 400
+    assert response.get_json()["block_index"] is None
+
+
+def test_invalid_archive_is_rejected(client):
+    headers = login(client, "owner")
+    response = _bulk(client, headers, archives=[io.BytesIO(b"not a zip")])
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid zip archive"
+
+
+def test_archive_limits_are_checked_before_unpacking(make_app):
+    app = make_app(BULK_UPLOAD_MAX_FILE_SIZE=4, BULK_UPLOAD_MAX_UNPACKED_SIZE=6)
+    client = app.test_client()
+    headers = login(client, "owner")
+
+    too_big = _bulk(client, headers, archives=[_zip({"big.txt": b"12345"})])
+    assert too_big.status_code == 400 and "byte limit" in too_big.get_json()["error"]
+
+    too_much = _bulk(client, headers, archives=[_zip({"a.txt": b"1234", "b.txt": b"1234"})])
+    assert too_much.status_code == 400 and "unpack" in too_much.get_json()["error"]
+    assert FileRecord.query.count() == 0
+
+
+def test_file_count_limit(make_app):
+    app = make_app(BULK_UPLOAD_MAX_FILES=2)
+    client = app.test_client()
+    headers = login(client, "owner")
+
+    response = _bulk(client, headers, files=[(f"{n}.txt", b"x") for n in range(3)])
+    assert response.status_code == 400
+    assert FileRecord.query.count() == 0
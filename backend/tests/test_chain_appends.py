@@ -0,0 +1,61 @@
+import multiprocessing
+import threading
+from models import Block, db
+from services.blockchain_service import BlockchainService
+from tests.conftest import make_config
+
+
+def _chain():
+    return Block.query.order_by(Block.index.asc()).all()
+
+
+def _assert_linked(blocks):
+    assert [b.index for b in blocks] == list(range(len(blocks)))
+    for prev, current in zip(blocks, blocks[1:]):
+        assert current.previous_hash == prev.block_hash
+
+
+def _append_blocks(database_uri, worker, count):
+    """Process entrypoint: append `count` blocks through a fresh app."""
+    from app import create_app
+    app = create_app(make_config(database_uri))
+    with app.app_context():
+        for n in range(count):
+            BlockchainService.add_block({"worker": worker, "n": n})
+        db.engine.dispose()
+
+
+# ---------------- APPEND SERIALIZATION ----------------
+def test_concurrent_thread_appends_extend_the_tip(app):
+    def append(worker):
+        with app.app_context():
+            for n in range(10):
+                BlockchainService.add_block({"worker": worker, "n": n})
+            db.session.remove()
+
+    threads = [threading.Thread(target=append, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    blocks = _chain()
+    assert len(blocks) == 41
+    _assert_linked(blocks)
+    assert BlockchainService.validate_chain(full=True)["valid"]
+
+
+def test_concurrent_process_appends_extend_the_tip(app, database_uri):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_append_blocks, args=(database_uri, w, 10)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    db.session.expire_all()
+    blocks = _chain()
+    assert len(blocks) == 41
+    _assert_linked(blocks)
+    assert BlockchainService.validate_chain(full=True)["valid"]
@@ -0,0 +1,62 @@
+import json
+from models import db
+from services.blockchain_service import BlockchainService
+
+
+def _tamper(index, payload):
+    block = BlockchainService.get_block_by_index(index)
+    block.data = json.dumps(payload, sort_keys=True)
+    db.session.commit()
+
+
+def test_incremental_validation_checks_only_new_blocks(app):
+    for n in range(5):
+        BlockchainService.add_block({"n": n})
+    assert BlockchainService.validate_chain()["blocks_checked"] == 6
+
+    BlockchainService.add_block({"n": 5})
+    report = BlockchainService.validate_chain()
+    assert report["valid"] and report["blocks_checked"] == 1
+
+
+def test_incremental_validation_detects_tampering_after_checkpoint(app):
+    for n in range(5):
+        BlockchainService.add_block({"n": n})
+    assert BlockchainService.validate_chain()["valid"]
+
+    BlockchainService.add_block({"n": 5})
+    _tamper(6, {"n": "forged"})
+
+    report = BlockchainService.validate_chain()
+    assert not report["valid"]
+    assert (report["first_invalid_index"], report["failure"]) == (6, "hash_mismatch")
+
+
+def test_rewritten_checkpoint_block_forces_a_full_rescan(app):
+    for n in range(5):
+        BlockchainService.add_block({"n": n})
+    assert BlockchainService.validate_chain()["valid"]
+
+    # Rewrite the checkpointed tip with a self-consistent hash
+    tip = BlockchainService.get_block_by_index(5)
+    tip.data = json.dumps({"n": "forged"}, sort_keys=True)
+    tip.block_hash = BlockchainService.calculate_hash(tip.index, tip.previous_hash, tip.data, tip.timestamp)
+    db.session.commit()
+
+    report = BlockchainService.validate_chain()
+    assert (report["first_invalid_index"], report["failure"]) == (5, "checkpoint_mismatch")
+
+    # The checkpoint is gone, so the next incremental run rescans from genesis
+    report = BlockchainService.validate_chain()
+    assert report["valid"] and report["blocks_checked"] == 6
+
+
+def test_full_validation_finds_tampering_behind_the_checkpoint(app):
+    for n in range(5):
+        BlockchainService.add_block({"n": n})
+    assert BlockchainService.validate_chain()["valid"]
+
+    _tamper(2, {"n": "forged"})
+
+    report = BlockchainService.validate_chain(full=True)
+    assert (report["first_invalid_index"], report["failure"]) == (2, "hash_mismatch")
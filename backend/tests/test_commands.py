@@ -0,0 +1,25 @@
+import os
+from models import FileRecord, User, db
+from services.storage_service import StorageService
+
+
+def test_backfill_file_sizes_finds_legacy_uploads_by_name(app):
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    # storage_uri written on the original Windows host; the bytes are in uploads/<name>
+    record = FileRecord(
+        user_id=user.id, name="invoice.pdf", filehash="a" * 64, size=0,
+        storage_uri="F:\\BlockNet\\backend\\instance/uploads\\invoice.pdf"
+    )
+    missing = FileRecord(user_id=user.id, name="gone.pdf", filehash="b" * 64, size=0, storage_uri=None)
+    db.session.add_all([record, missing])
+    db.session.commit()
+    with open(os.path.join(StorageService.upload_dir(), "invoice.pdf"), "wb") as f:
+        f.write(b"12345")
+
+    result = app.test_cli_runner().invoke(args=["backfill-file-sizes"])
+
+    assert "Updated 1 file(s)" in result.output
+    assert db.session.get(FileRecord, record.id).size == 5
+    assert db.session.get(FileRecord, missing.id).size == 0
@@ -0,0 +1,68 @@
+import io
+from datetime import datetime
+import pytest
+from models import Certificate, FileRecord, FileShare, db
+from tests.conftest import login
+from utils import encode_cursor
+
+
+def _upload(client, headers, name):
+    response = client.post(
+        "/api/files/upload", headers=headers,
+        data={"file": (io.BytesIO(name.encode()), name)}, content_type="multipart/form-data"
+    )
+    return response.get_json()["file"]["id"]
+
+
+@pytest.fixture
+def owner(client):
+    headers = login(client, "owner")
+    login(client, "receiver")
+    file_ids = [_upload(client, headers, f"f{n}.txt") for n in range(3)]
+    client.post("/api/share/share", headers=headers, json={"receiver_email": "receiver@example.com", "file_id": file_ids[0]})
+
+    # Files and certificates share ids, so equal times leave only (type, id) to order them
+    now = datetime(2026, 1, 1)
+    FileRecord.query.update({"created_at": now})
+    Certificate.query.update({"issued_at": now})
+    FileShare.query.update({"created_at": now})
+    db.session.commit()
+    return headers
+
+
+def test_stats_count_the_owners_files(client, owner):
+    stats = client.get("/api/dashboard", headers=owner).get_json()["stats"]
+    assert stats == {"totalFiles": 3, "sharedFiles": 1, "verifications": 3, "pendingVerifications": 0}
+
+    _upload(client, owner, "f3.txt")
+    assert client.get("/api/dashboard", headers=owner).get_json()["stats"]["totalFiles"] == 4
+
+
+def test_activity_pages_cover_every_event_once(client, owner):
+    first = client.get("/api/dashboard", headers=owner).get_json()["recentActivity"]
+    assert len(first) == 7  # 3 uploads, 3 certificates, 1 share
+
+    events, cursor = [], None
+    while True:
+        response = client.get("/api/dashboard", headers=owner, query_string={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        page = response.get_json()["recentActivity"]
+        assert len(page) <= 3
+        events.extend(page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert events == first
+    assert sorted(e["type"] for e in events) == ["share"] + ["upload"] * 3 + ["verify"] * 3
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor(["2026-01-01T00:00:00", "upload"]),
+    encode_cursor([1, "upload", 1]),
+    encode_cursor(["2026-01-01T00:00:00", "upload", "1"]),
+    encode_cursor(["yesterday", "upload", 1]),
+])
+def test_malformed_cursor_is_a_400(client, owner, cursor):
+    response = client.get("/api/dashboard", headers=owner, query_string={"cursor": cursor})
+    assert response.status_code == 400
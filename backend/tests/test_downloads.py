@@ -0,0 +1,82 @@
+import io
+import pytest
+from tests.conftest import login
+
+CONTENT = b"0123456789" * 10
+
+
+def _upload(client):
+    """Upload CONTENT as a new user; returns (headers, download url, filehash)."""
+    headers = login(client, "owner")
+    response = client.post(
+        "/api/files/upload", headers=headers,
+        data={"file": (io.BytesIO(CONTENT), "digits.txt")}, content_type="multipart/form-data"
+    )
+    file = response.get_json()["file"]
+    return headers, f"/api/files/download/{file['id']}", file["filehash"]
+
+
+@pytest.fixture
+def uploaded(client):
+    return _upload(client)
+
+
+def test_download_carries_the_filehash_as_strong_etag(client, uploaded):
+    headers, url, filehash = uploaded
+    response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers["ETag"] == f'"{filehash}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_matching_if_none_match_is_a_304(client, uploaded):
+    headers, url, filehash = uploaded
+    response = client.get(url, headers={**headers, "If-None-Match": f'"{filehash}"'})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    stale = client.get(url, headers={**headers, "If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_range_request_returns_the_slice(client, uploaded):
+    headers, url, filehash = uploaded
+    response = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.data == CONTENT[10:20]
+    assert response.headers["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+
+
+def test_if_range_with_another_etag_sends_the_whole_file(client, uploaded):
+    headers, url, filehash = uploaded
+    response = client.get(url, headers={**headers, "Range": "bytes=10-19", "If-Range": '"other"'})
+    assert response.status_code == 200
+    assert response.data == CONTENT
+
+
+def test_unsatisfiable_range_is_a_416(client, uploaded):
+    headers, url, filehash = uploaded
+    response = client.get(url, headers={**headers, "Range": "bytes=500-600"})
+    assert response.status_code == 416
+
+
+def test_accel_redirect_leaves_the_body_to_nginx(make_app):
+    app = make_app(DOWNLOAD_OFFLOAD="x-accel-redirect")
+    client = app.test_client()
+    headers, url, filehash = _upload(client)
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200 and response.data == b""
+    assert response.headers["X-Accel-Redirect"] == f"/protected-uploads/{filehash[:2]}/{filehash[2:4]}/{filehash}"
+    assert response.headers["ETag"] == f'"{filehash}"'
+
+    cached = client.get(url, headers={**headers, "If-None-Match": f'"{filehash}"'})
+    assert cached.status_code == 304
+
+
+def test_other_users_cannot_download(client, uploaded):
+    _, url, _ = uploaded
+    assert client.get(url, headers=login(client, "stranger")).status_code == 403
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+import pytest
+from models import db
+from services.email_service import EmailOutbox, EmailService, stub_transport
+
+
+@pytest.fixture(autouse=True)
+def clear_stub():
+    stub_transport.sent.clear()
+
+
+def _due(entry):
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_queued_email_is_delivered_once(app):
+    EmailService.queue_email("Hello", ["a@example.com"], "body")
+
+    assert EmailService.process_outbox() == 1
+    assert EmailService.process_outbox() == 0
+    assert [m.subject for m in stub_transport.sent] == ["Hello"]
+    assert EmailOutbox.query.one().status == "sent"
+
+
+def test_uncommitted_email_is_not_sent(app):
+    EmailService.queue_email("Hello", ["a@example.com"], "body", commit=False)
+    db.session.rollback()
+
+    assert EmailService.process_outbox() == 0
+    assert stub_transport.sent == []
+
+
+class _FailingConnection:
+    """Fails every send, and optionally again when the connection closes."""
+
+    def __init__(self, fail_on_close):
+        self.fail_on_close = fail_on_close
+
+    def open(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.fail_on_close:
+            raise ConnectionError("connection dropped")
+        return False
+
+    def send(self, message):
+        raise ConnectionError("recipient refused")
+
+
+@pytest.mark.parametrize("fail_on_close", [False, True])
+def test_failed_send_counts_one_attempt(app, monkeypatch, fail_on_close):
+    monkeypatch.setattr(EmailService, "transport", staticmethod(lambda: _FailingConnection(fail_on_close)))
+    entry = EmailService.queue_email("Hello", ["a@example.com"], "body")
+
+    EmailService.process_outbox()
+    assert (entry.attempts, entry.status) == (1, "pending")
+    backoff = (entry.next_attempt_at - datetime.utcnow()).total_seconds()
+    assert backoff <= app.config["EMAIL_RETRY_BACKOFF"]
+
+    for _ in range(app.config["EMAIL_MAX_ATTEMPTS"] - 1):
+        _due(entry)
+        EmailService.process_outbox()
+    assert (entry.attempts, entry.status) == (app.config["EMAIL_MAX_ATTEMPTS"], "failed")
+
+
+def test_connection_failure_reschedules_every_entry(app, monkeypatch):
+    class Unreachable:
+        def open(self):
+            raise ConnectionError("no route to host")
+    monkeypatch.setattr(EmailService, "transport", staticmethod(Unreachable))
+    entries = [EmailService.queue_email(f"Hello {i}", ["a@example.com"], "body") for i in range(2)]
+
+    assert EmailService.process_outbox() == 2
+    assert [e.attempts for e in entries] == [1, 1]
+
+
+def test_purge_removes_only_old_finished_entries(app):
+    old = datetime.utcnow() - timedelta(days=app.config["EMAIL_RETENTION_DAYS"] + 1)
+    rows = {
+        status: EmailOutbox(subject=status, recipients="[]", body="OTP 123456", status=status, created_at=created)
+        for status, created in [("sent", old), ("failed", old), ("pending", old), ("recent", datetime.utcnow())]
+    }
+    rows["recent"].status = "sent"
+    db.session.add_all(rows.values())
+    db.session.commit()
+
+    assert EmailService.purge_finished() == 2
+    assert sorted(e.subject for e in EmailOutbox.query) == ["pending", "recent"]
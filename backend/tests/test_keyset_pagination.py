@@ -0,0 +1,79 @@
+from datetime import datetime
+import pytest
+from models import FileRecord, FileShare, User, db
+from tests.conftest import login
+from utils import encode_cursor
+
+CREATED = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def owner(client):
+    headers = login(client, "owner")
+    user = User.query.filter_by(username="owner").one()
+    # Equal timestamps, so pages only stay stable through the id tiebreaker
+    db.session.add_all([
+        FileRecord(user_id=user.id, name=f"f{n:02}.txt", filehash=f"{n:064x}", size=n, created_at=CREATED)
+        for n in range(7)
+    ])
+    db.session.commit()
+    return headers
+
+
+def _walk(client, headers, path, **params):
+    """Follow X-Next-Cursor to the end; returns the pages."""
+    pages, cursor = [], None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        response = client.get(path, headers=headers, query_string=query)
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort, order", [("created_at", "desc"), ("created_at", "asc"), ("name", "asc"), ("size", "desc")])
+def test_pages_cover_every_file_once(client, owner, sort, order):
+    pages = _walk(client, owner, "/api/files", limit=3, sort=sort, order=order)
+
+    assert [len(p) for p in pages] == [3, 3, 1]
+    names = [f["name"] for page in pages for f in page]
+    assert sorted(names) == [f"f{n:02}.txt" for n in range(7)]
+    if sort != "created_at":
+        assert names == sorted(names, reverse=order == "desc")
+
+
+def test_last_full_page_has_no_cursor(client, owner):
+    response = client.get("/api/files", headers=owner, query_string={"limit": 7})
+    assert len(response.get_json()) == 7
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "not-a-cursor"},
+    {"cursor": encode_cursor(["2026-01-01T00:00:00"])},
+    {"cursor": encode_cursor([1, 2])},
+    {"cursor": encode_cursor(["2026-01-01T00:00:00", "2"])},
+    {"cursor": encode_cursor({"id": 1})},
+    {"sort": "filehash"},
+    {"order": "sideways"},
+])
+def test_malformed_parameters_are_a_400(client, owner, params):
+    response = client.get("/api/files", headers=owner, query_string=params)
+    assert response.status_code == 400
+
+
+def test_shares_are_paged_with_the_same_cursors(client, owner):
+    headers = login(client, "receiver")
+    receiver = User.query.filter_by(username="receiver").one()
+    sender = User.query.filter_by(username="owner").one()
+    db.session.add_all([
+        FileShare(file_id=f.id, sender_id=sender.id, receiver_id=receiver.id, created_at=CREATED)
+        for f in FileRecord.query.all()
+    ])
+    db.session.commit()
+
+    pages = _walk(client, headers, "/api/share/shared-with-me", limit=4)
+    assert [len(p) for p in pages] == [4, 3]
+    assert len({s["id"] for page in pages for s in page}) == 7
@@ -0,0 +1,65 @@
+import json
+from models import FileRecord, db
+from services.batch_service import BatchService
+from services.blockchain_service import BlockchainService
+from services.chain_audit import ChainAuditService
+from tests.conftest import create_user
+
+
+def _batch_block(user, names):
+    """Register files as the leaves of one batch block."""
+    records = [
+        FileRecord(user_id=user.id, name=name, filehash=f"{i + 1:064x}", storage_uri=name, size=1)
+        for i, name in enumerate(names)
+    ]
+    db.session.add_all(records)
+    db.session.flush()
+    block = BlockchainService.add_block(BatchService.block_data(records), commit=False)
+    BatchService.assign_leaves(records, block.index)
+    db.session.commit()
+    return block, records
+
+
+def test_every_leaf_of_a_batch_block_verifies(app):
+    block, records = _batch_block(create_user(), ["a", "b", "c"])
+    for record in records:
+        assert BlockchainService.verify_inclusion(record, record.filehash)
+        assert not BlockchainService.verify_inclusion(record, "f" * 64)
+    assert BlockchainService.get_inclusion_proof(records[0])["merkle_root"] == json.loads(block.data)["merkle_root"]
+
+
+def test_forged_merkle_root_column_fails_validation(app):
+    block, records = _batch_block(create_user(), ["a", "b", "c"])
+    forged = "e" * 64
+
+    # Point the unhashed column at a single-leaf tree for another file
+    block.merkle_root = forged
+    records[0].merkle_proof = "[]"
+    db.session.commit()
+
+    report = BlockchainService.validate_chain(full=True)
+    assert (report["first_invalid_index"], report["failure"]) == (block.index, "column_mismatch")
+    assert report["failures"][0]["actual"] == {"merkle_root": forged}
+
+    audit = ChainAuditService.audit(workers=1)
+    assert (audit["first_invalid_index"], audit["failure"]) == (block.index, "column_mismatch")
+
+
+def test_forged_proof_does_not_verify(app):
+    _, records = _batch_block(create_user(), ["a", "b"])
+    forged = "e" * 64
+    records[0].merkle_proof = json.dumps([{"hash": records[1].filehash, "position": "right"}])
+    db.session.commit()
+
+    assert not BlockchainService.verify_inclusion(records[0], forged)
+    assert BlockchainService.verify_inclusion(records[0], records[0].filehash)
+
+
+def test_legacy_block_verifies_against_its_filehash(app):
+    # Blocks from before Merkle roots carry only the file hash
+    BlockchainService.add_block({"type": "file", "file_id": 1, "filehash": "a" * 64})
+    record = FileRecord(id=1, block_index=1, filehash="a" * 64)
+
+    assert BlockchainService.verify_inclusion(record, "a" * 64)
+    assert not BlockchainService.verify_inclusion(record, "b" * 64)
+    assert BlockchainService.verify_inclusion(record, "a" * 64, block_index=99) is None
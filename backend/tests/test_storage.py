@@ -0,0 +1,71 @@
+import io
+import os
+import time
+from models import FileRecord, User, db
+from services.storage_service import StorageService
+
+
+def _age(path, seconds=7200):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_identical_content_is_stored_once(app):
+    first = StorageService.store(io.BytesIO(b"same"))
+    second = StorageService.store(io.BytesIO(b"same"))
+    assert first[0] == second[0]
+    assert (first[3], second[3]) == (True, False)
+    assert not [n for n in os.listdir(StorageService.upload_dir()) if n.startswith(".upload-")]
+
+
+def test_sweep_removes_only_old_unreferenced_blobs(app):
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+
+    kept, filehash, _, _ = StorageService.store(io.BytesIO(b"kept"))
+    db.session.add(FileRecord(user_id=user.id, name="kept", filehash=filehash, storage_uri=kept, size=4))
+    db.session.commit()
+    orphan = StorageService.store(io.BytesIO(b"orphan"))[0]
+    recent = StorageService.store(io.BytesIO(b"recent"))[0]
+    for path in (kept, orphan):
+        _age(path)
+
+    assert StorageService.sweep(3600) == 1
+    assert os.path.exists(kept) and os.path.exists(recent)
+    assert not os.path.exists(orphan)
+
+
+def test_reused_blob_survives_the_sweep(app):
+    path = StorageService.store(io.BytesIO(b"reused"))[0]
+    _age(path)
+
+    # Deduplicating onto the blob marks it as recently used
+    StorageService.store(io.BytesIO(b"reused"))
+    assert StorageService.sweep(3600) == 0
+    assert os.path.exists(path)
+
+
+def test_sweep_keeps_legacy_uploads_served_by_name(app):
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    # Records from the original Windows host: storage_uri is not a path here,
+    # so download_file falls back to uploads/<name>
+    db.session.add(FileRecord(
+        user_id=user.id, name="invoice (1).pdf", filehash="a" * 64, size=3,
+        storage_uri="F:\\BlockNet\\backend\\instance/uploads\\invoice (1).pdf"
+    ))
+    db.session.commit()
+
+    upload_dir = StorageService.upload_dir()
+    served = os.path.join(upload_dir, "invoice (1).pdf")
+    stray = os.path.join(upload_dir, "stray.pdf")
+    for path in (served, stray):
+        with open(path, "wb") as f:
+            f.write(b"pdf")
+        _age(path)
+
+    assert StorageService.sweep(3600) == 1
+    assert os.path.exists(served)
+    assert not os.path.exists(stray)
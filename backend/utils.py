@@ -1,7 +1,15 @@
+import base64
 import hashlib
+import json
 import os
+import tempfile
+from datetime import datetime
+from sqlalchemy import and_, or_
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask import jsonify
+from flask import jsonify, request
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
 
 
 def hash_file(file_stream, chunk_size=8192):
@@ -12,6 +20,32 @@ def hash_file(file_stream, chunk_size=8192):
     return sha256.hexdigest()
 
 
+def stream_to_tempfile(file_stream, directory, chunk_size=1024 * 1024, max_size=None):
+    """
+    Copy a stream into a temp file inside `directory`, hashing each chunk as it
+    is written so the data is only read once.
+    Returns (temp_path, sha256 hexdigest, size in bytes); the caller renames
+    the temp file into place with os.replace (atomic on the same filesystem).
+    Raises ValueError, leaving nothing behind, once more than max_size bytes
+    have been read.
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := file_stream.read(chunk_size):
+                sha256.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise ValueError(f"File exceeds the {max_size} byte limit")
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, sha256.hexdigest(), size
+
+
 def hash_password(password: str) -> str:
     return generate_password_hash(password)
 
@@ -28,3 +62,130 @@ def api_response(success=True, message="", data=None, status=200):
         "data": data,
     }
     return jsonify(payload), status
+
+
+# ---------------- PAGINATION ----------------
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def cursor_value(value, python_type):
+    """
+    Check a decoded cursor value against the column type it is compared to.
+    Cursors come from the client, so anything of the wrong type is a
+    ValueError (a 400), never a TypeError deeper in the query.
+    """
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return datetime.fromisoformat(value)
+    if python_type is int or python_type is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("Invalid cursor")
+        return python_type(value)
+    if not isinstance(value, python_type):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def _parse_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date")
+
+
+def apply_list_filters(query, name_columns=(), date_column=None, verified_column=None):
+    """
+    Apply the shared listing filters from the query string:
+    ?name= (substring, case-insensitive), ?date_from=&date_to= (ISO 8601)
+    and ?verified=true|false. Raises ValueError on malformed values.
+    """
+    name = request.args.get("name", "").strip()
+    if name and name_columns:
+        query = query.filter(or_(*[column.ilike(f"%{name}%") for column in name_columns]))
+
+    if date_column is not None:
+        date_from = _parse_date_arg("date_from")
+        date_to = _parse_date_arg("date_to")
+        if date_from:
+            query = query.filter(date_column >= date_from)
+        if date_to:
+            query = query.filter(date_column <= date_to)
+
+    verified = request.args.get("verified")
+    if verified is not None and verified_column is not None:
+        query = query.filter(verified_column.is_(verified.lower() in ("1", "true", "yes")))
+
+    return query
+
+
+def keyset_paginate(query, sort_columns, tiebreaker, default_sort="created_at"):
+    """
+    Page a query with ?limit=&cursor=&sort=&order=.
+    sort_columns maps public sort keys to model columns; tiebreaker is a unique
+    column (usually the primary key) that makes the ordering total.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    Raises ValueError on unsupported parameters.
+    """
+    sort = request.args.get("sort", default_sort)
+    if sort not in sort_columns:
+        raise ValueError(f"sort must be one of: {', '.join(sort_columns)}")
+    column = sort_columns[sort]
+
+    order = request.args.get("order", "desc").lower()
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        value = cursor_value(values[0], column.type.python_type)
+        last_id = cursor_value(values[1], tiebreaker.type.python_type)
+
+        if order == "desc":
+            query = query.filter(or_(column < value, and_(column == value, tiebreaker < last_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, tiebreaker > last_id)))
+
+    if order == "desc":
+        query = query.order_by(column.desc(), tiebreaker.desc())
+    else:
+        query = query.order_by(column.asc(), tiebreaker.asc())
+
+    # Fetch one extra row to know whether another page exists
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key), getattr(last, tiebreaker.key)])
+
+    return items, next_cursor
+
+
+def paginated_response(data, next_cursor):
+    """JSON list body; the next page's cursor travels in X-Next-Cursor."""
+    response = jsonify(data)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
@@ -1,6 +1,7 @@
-from app import create_app
+from app import create_app, start_background_workers
 
 app = create_app()
+start_background_workers(app)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)